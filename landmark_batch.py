@@ -0,0 +1,180 @@
+"""Headless batch landmark extraction.
+
+Walks directories / file lists of images, runs FaceMesh in a pool of worker
+processes (one FaceMesh instance per worker) and writes every result into a
+single (images x landmarks x 3) float32 .npy memmap plus a CSV index.
+
+    python -m landmark_batch photos/ -o landmarks
+    python -m landmark_batch --file-list images.txt -o landmarks --default-selection
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from landmark_overlay import DEFAULT_LANDMARK_INDICES, NUM_LANDMARKS, landmarks_to_array
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".tif")
+
+# Per-worker state, set up once by init_worker
+_face_mesh = None
+_selection = None
+_max_dim = None
+
+
+def find_images(paths, file_lists=()):
+    """Expand directories (recursively) and list files into a sorted list of image paths."""
+    paths = list(paths)
+    for list_path in file_lists:
+        with open(list_path) as f:
+            paths.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                found.extend(os.path.join(dirpath, name) for name in filenames
+                             if name.lower().endswith(IMAGE_EXTENSIONS))
+        else:
+            found.append(path)
+    return sorted(found)
+
+
+def load_selection(filepath):
+    """Read the indices written by the GUI's "Save Selection" (one index per line, up to the first blank line)."""
+    indices = []
+    with open(filepath) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                if indices:
+                    break  # the GUI's other formats of the same list follow
+                continue
+            indices.append(int(line))
+    return sorted(set(indices))
+
+
+def init_worker(min_detection_confidence, min_tracking_confidence, refine_landmarks, selection, max_dim):
+    global _face_mesh, _selection, _max_dim
+    import mediapipe as mp
+    _face_mesh = mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=True,
+        max_num_faces=1,
+        refine_landmarks=refine_landmarks,
+        min_detection_confidence=min_detection_confidence,
+        min_tracking_confidence=min_tracking_confidence
+    )
+    _selection = None if selection is None else np.asarray(selection, dtype=np.intp)
+    _max_dim = max_dim
+
+
+def process_path(item):
+    """Worker task: returns (row, landmarks or None, error message or None)."""
+    row, path = item
+    try:
+        image = cv2.imread(path)
+        if image is None:
+            return row, None, "unreadable image"
+        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        height, width = image_rgb.shape[:2]
+        if _max_dim and (width > _max_dim or height > _max_dim):
+            scale = min(_max_dim / width, _max_dim / height)
+            image_rgb = cv2.resize(image_rgb, (int(width * scale), int(height * scale)))
+        results = _face_mesh.process(image_rgb)
+        if not results.multi_face_landmarks:
+            return row, None, "no face"
+        landmarks = landmarks_to_array(results.multi_face_landmarks[0])
+        if _selection is not None:
+            landmarks = landmarks[_selection]
+        return row, landmarks, None
+    except Exception as e:
+        return row, None, str(e)
+
+
+def run_batch(image_paths, output_prefix, workers=None, selection=None, refine_landmarks=True,
+              min_detection_confidence=0.5, min_tracking_confidence=0.5, max_dim=800, chunksize=4):
+    """Extract landmarks for every path; returns (landmarks memmap, elapsed seconds).
+
+    Rows for images without a detected face are left as NaN.
+    """
+    num_points = len(selection) if selection is not None else (NUM_LANDMARKS if refine_landmarks else 468)
+    landmarks_out = np.lib.format.open_memmap(f"{output_prefix}.npy", mode="w+", dtype=np.float32,
+                                              shape=(len(image_paths), num_points, 3))
+    landmarks_out[:] = np.nan
+    status = [""] * len(image_paths)
+
+    start = time.perf_counter()
+    init_args = (min_detection_confidence, min_tracking_confidence, refine_landmarks, selection, max_dim)
+    with multiprocessing.Pool(processes=workers, initializer=init_worker, initargs=init_args) as pool:
+        for row, landmarks, error in pool.imap_unordered(process_path, enumerate(image_paths), chunksize):
+            if landmarks is not None:
+                landmarks_out[row, :len(landmarks)] = landmarks
+            status[row] = error or "ok"
+    elapsed = time.perf_counter() - start
+    landmarks_out.flush()
+
+    with open(f"{output_prefix}.index.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["row", "path", "status"])
+        writer.writerows((row, path, status[row]) for row, path in enumerate(image_paths))
+    if selection is not None:
+        with open(f"{output_prefix}.selection.txt", "w") as f:
+            f.write("\n".join(map(str, selection)) + "\n")
+    return landmarks_out, elapsed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Batch MediaPipe face landmark extraction")
+    parser.add_argument("paths", nargs="*", help="Image files and/or directories (searched recursively)")
+    parser.add_argument("--file-list", action="append", default=[], help="Text file with one image path per line")
+    parser.add_argument("-o", "--output", default="landmarks",
+                        help="Output prefix; writes <prefix>.npy and <prefix>.index.csv (default: landmarks)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument("--selection", help="Keep only the indices in a file saved by the GUI")
+    selection.add_argument("--default-selection", action="store_true", help="Keep only DEFAULT_LANDMARK_INDICES")
+    parser.add_argument("--no-refine", action="store_true", help="Disable refine_landmarks (468 points)")
+    parser.add_argument("--min-detection-confidence", type=float, default=0.5)
+    parser.add_argument("--min-tracking-confidence", type=float, default=0.5)
+    parser.add_argument("--max-dim", type=int, default=800,
+                        help="Downscale images larger than this before inference, like the GUI (0 disables)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    image_paths = find_images(args.paths, args.file_list)
+    if not image_paths:
+        print("No images found")
+        return 1
+
+    selection = None
+    if args.selection:
+        selection = load_selection(args.selection)
+        if not selection:
+            print(f"No landmark indices in {args.selection}")
+            return 1
+    elif args.default_selection:
+        selection = list(DEFAULT_LANDMARK_INDICES)
+
+    landmarks, elapsed = run_batch(
+        image_paths, args.output, workers=args.workers, selection=selection,
+        refine_landmarks=not args.no_refine,
+        min_detection_confidence=args.min_detection_confidence,
+        min_tracking_confidence=args.min_tracking_confidence,
+        max_dim=args.max_dim
+    )
+    detected = int(np.count_nonzero(~np.isnan(landmarks[:, 0, 0])))
+    workers = args.workers or multiprocessing.cpu_count()
+    print(f"Processed {len(image_paths)} images ({detected} with a face) in {elapsed:.2f}s "
+          f"with {workers} workers - {len(image_paths) / elapsed:.1f} images/sec")
+    print(f"Wrote {args.output}.npy {landmarks.shape} and {args.output}.index.csv")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""Offline benchmarks for the inference and rendering hot paths.
+
+Runs on a CPU-only box without a display: frames are synthetic (or loaded from
+--image), and drawing goes through the headless render_overlay() path. Repainting
+the persistent Tk PhotoImage (PersistentPhoto.update, i.e. paste()) is only
+measured with --tk when a display (or Xvfb) is available.
+
+    python -m landmark_benchmark -o bench.json
+    python -m landmark_benchmark -o new.json --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from landmark_overlay import NUM_LANDMARKS, OverlayOptions, render_overlay
+from landmark_pipeline import SyntheticFrameSource
+from landmark_selection import LandmarkGrid, points_in_polygon
+
+RESOLUTIONS = ((640, 480), (1280, 720), (1920, 1080))
+CANVAS_SIZE = (960, 720)  # canvas area of the default 1000x720 window
+
+
+def synthetic_landmarks(seed=0, num_landmarks=NUM_LANDMARKS):
+    """Deterministic (N, 3) normalized landmarks spread over a face-sized ellipse."""
+    rng = np.random.default_rng(seed)
+    angle = rng.uniform(0, 2 * np.pi, num_landmarks)
+    radius = np.sqrt(rng.uniform(0, 1, num_landmarks))
+    landmarks = np.empty((num_landmarks, 3), dtype=np.float32)
+    landmarks[:, 0] = 0.5 + 0.15 * radius * np.cos(angle)
+    landmarks[:, 1] = 0.5 + 0.22 * radius * np.sin(angle)
+    landmarks[:, 2] = rng.normal(0, 0.02, num_landmarks)
+    return landmarks
+
+
+def test_frame(width, height, image_path=None):
+    """RGB frame of the given size: a resized --image or a synthetic face-like frame."""
+    if image_path:
+        image = cv2.imread(image_path)
+        if image is None:
+            raise ValueError(f"Could not read {image_path}")
+        return cv2.cvtColor(cv2.resize(image, (width, height)), cv2.COLOR_BGR2RGB)
+    ret, frame = SyntheticFrameSource(width, height, fps=0).read()
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def display_size(width, height, canvas_size=CANVAS_SIZE):
+    scale = min(canvas_size[0] / width, canvas_size[1] / height)
+    return int(width * scale), int(height * scale)
+
+
+def time_call(fn, repeats, warmup=3):
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(repeats, dtype=np.float64)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+    samples *= 1000.0
+    return {"repeats": repeats, "mean_ms": float(samples.mean()), "p50_ms": float(np.percentile(samples, 50)),
+            "p95_ms": float(np.percentile(samples, 95)), "min_ms": float(samples.min())}
+
+
+def bench_inference(frame, repeats):
+    """Time FaceMesh in video and static mode; `faces_detected` tells whether the landmark model ran at all."""
+    import mediapipe as mp
+    results = {}
+    for mode, static_image_mode in (("video", False), ("static", True)):
+        face_mesh = mp.solutions.face_mesh.FaceMesh(static_image_mode=static_image_mode, max_num_faces=1,
+                                                    refine_landmarks=True, min_detection_confidence=0.5,
+                                                    min_tracking_confidence=0.5)
+        try:
+            stats = time_call(lambda: face_mesh.process(frame), repeats)
+            stats["faces_detected"] = len(face_mesh.process(frame).multi_face_landmarks or [])
+        finally:
+            face_mesh.close()
+        if not stats["faces_detected"]:
+            print(f"warning: inference_{mode} at {frame.shape[1]}x{frame.shape[0]} found no face, so only the "
+                  f"face detector was timed; pass --image with a face photo", file=sys.stderr)
+        results[f"inference_{mode}"] = stats
+    return results
+
+
+def bench_resize(frame, repeats):
+    size = display_size(frame.shape[1], frame.shape[0])
+    return {"resize": time_call(lambda: cv2.resize(frame, size), repeats)}
+
+
+def bench_overlay(frame, landmarks, repeats):
+    display = cv2.resize(frame, display_size(frame.shape[1], frame.shape[0]))
+    return {
+        "overlay_full": time_call(lambda: render_overlay(display, landmarks), repeats),
+        "overlay_tesselation": time_call(
+            lambda: render_overlay(display, landmarks, OverlayOptions(show_contours=False)), repeats),
+        "overlay_contours": time_call(
+            lambda: render_overlay(display, landmarks, OverlayOptions(show_tesselation=False)), repeats),
+    }
+
+
+def synthetic_faces(num_faces, seed=0):
+    """(faces, N, 3) landmarks: the synthetic face scaled down and tiled side by side."""
+    faces = np.repeat(synthetic_landmarks(seed)[None], num_faces, axis=0)
+    faces[..., :2] = (faces[..., :2] - 0.5) / num_faces + 0.5
+    faces[..., 0] += (np.arange(num_faces)[:, None] - (num_faces - 1) / 2) / num_faces
+    return faces
+
+
+def bench_faces(frame, repeats, face_counts=(1, 2, 4, 8)):
+    """Batched overlay cost as faces are added (all faces drawn in one polylines call per layer)."""
+    display = cv2.resize(frame, display_size(frame.shape[1], frame.shape[0]))
+    return {f"overlay_{faces}faces": time_call(lambda: render_overlay(display, synthetic_faces(faces)), repeats)
+            for faces in face_counts}
+
+
+def bench_hit_test(frame, landmarks, repeats, clicks=200):
+    display_w, display_h = display_size(frame.shape[1], frame.shape[0])
+    points = (landmarks[:, :2] * (display_w, display_h)).astype(np.int32)
+    rng = np.random.default_rng(1)
+    click_points = (points[rng.integers(0, len(points), clicks)] + rng.integers(-4, 5, (clicks, 2))).tolist()
+    grid = LandmarkGrid(points)
+
+    def run():
+        for x, y in click_points:
+            grid.nearest(x, y, 9)
+
+    result = time_call(run, repeats)
+    for key in ("mean_ms", "p50_ms", "p95_ms", "min_ms"):
+        result[key] /= clicks  # report per click
+    result["clicks_per_repeat"] = clicks
+
+    # Lasso around the central half of the face: one vectorized point-in-polygon test
+    angles = np.linspace(0, 2 * np.pi, 64, endpoint=False)
+    lasso = np.stack([display_w * (0.5 + 0.08 * np.cos(angles)),
+                      display_h * (0.5 + 0.11 * np.sin(angles))], axis=1)
+    return {
+        "grid_build": time_call(lambda: LandmarkGrid(points), repeats),
+        "hit_test": result,
+        "lasso_select": time_call(lambda: points_in_polygon(points, lasso), repeats),
+    }
+
+
+def bench_tk_photo(frame, repeats):
+    """Time the app's display path: repainting one PersistentPhoto with paste()."""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as e:
+        return {"tk_photo": {"skipped": f"no display: {e}"}}
+    try:
+        from landmark_buffers import PersistentPhoto
+        display = cv2.resize(frame, display_size(frame.shape[1], frame.shape[0]))
+        photo = PersistentPhoto()
+        return {"tk_photo": time_call(lambda: photo.update(display), repeats)}
+    finally:
+        root.destroy()
+
+
+def run_benchmarks(resolutions=RESOLUTIONS, repeats=30, image_path=None, include_inference=True,
+                   include_tk=False):
+    landmarks = synthetic_landmarks()
+    results = []
+    for width, height in resolutions:
+        frame = test_frame(width, height, image_path)
+        timings = {}
+        if include_inference:
+            timings.update(bench_inference(frame, repeats))
+        timings.update(bench_resize(frame, repeats))
+        timings.update(bench_overlay(frame, landmarks, repeats))
+        timings.update(bench_faces(frame, repeats))
+        timings.update(bench_hit_test(frame, landmarks, repeats))
+        if include_tk:
+            timings.update(bench_tk_photo(frame, repeats))
+        for name, stats in timings.items():
+            results.append(dict(name=name, resolution=f"{width}x{height}", **stats))
+    return results
+
+
+def environment():
+    info = {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "cpu_count": os.cpu_count(),
+            "numpy": np.__version__, "opencv": cv2.__version__,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+    try:
+        import mediapipe as mp
+        info["mediapipe"] = mp.__version__
+    except ImportError:
+        info["mediapipe"] = None
+    return info
+
+
+def print_results(results, baseline=None):
+    previous = {(r["name"], r["resolution"]): r for r in (baseline or [])}
+    print(f"{'benchmark':<22}{'resolution':>12}{'p50 ms':>10}{'p95 ms':>10}" + ("   vs baseline" if baseline else ""))
+    for r in results:
+        if "p50_ms" not in r:
+            print(f"{r['name']:<22}{r['resolution']:>12}  {r.get('skipped', '')}")
+            continue
+        line = f"{r['name']:<22}{r['resolution']:>12}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}"
+        old = previous.get((r["name"], r["resolution"]))
+        if old and old.get("p50_ms"):
+            line += f"   {r['p50_ms'] / old['p50_ms']:.2f}x"
+        if r.get("faces_detected") == 0:
+            line += "   (no face: detector only)"
+        print(line)
+
+
+def parse_resolution(value):
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the landmark selector hot paths")
+    parser.add_argument("-o", "--output", help="Write results as JSON to this file")
+    parser.add_argument("-n", "--repeats", type=int, default=30)
+    parser.add_argument("--resolution", action="append", type=parse_resolution,
+                        help="WIDTHxHEIGHT to benchmark (repeatable; default: 640x480, 1280x720, 1920x1080)")
+    parser.add_argument("--image", help="Face image to use instead of a synthetic frame")
+    parser.add_argument("--skip-inference", action="store_true", help="Only benchmark the rendering paths")
+    parser.add_argument("--tk", action="store_true", help="Also time the PhotoImage paste() update (needs a display)")
+    parser.add_argument("--compare", help="Earlier JSON results to compare p50 timings against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_benchmarks(args.resolution or RESOLUTIONS, args.repeats, args.image,
+                             include_inference=not args.skip_inference, include_tk=args.tk)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(), "repeats": args.repeats, "results": results}, f, indent=1)
+        print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Preallocated frame buffers for the live video path.
+
+BufferPool hands out named arrays that are reused for as long as the requested
+shape stays the same, so OpenCV calls can write into them through `dst=`.
+FramePool is a thread-safe free list for frames that cross threads in the
+pipeline. PersistentPhoto keeps one Tk PhotoImage per display size and
+updates it with paste() instead of building a new one every frame.
+RenderCache keeps finished renders of still content for the current canvas
+size, so redraws that change nothing visible skip resizing and overlay drawing.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image, ImageTk
+
+
+class BufferPool:
+    def __init__(self):
+        self._buffers = {}
+        self.allocations = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != tuple(shape) or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buffer
+            self.allocations += 1
+        return buffer
+
+    def clear(self):
+        self._buffers.clear()
+
+    def nbytes(self):
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+
+class FramePool:
+    """Free list of frame-sized arrays; frames must be released by whoever drops or replaces them.
+
+    A frame that is never released is simply garbage collected, and acquire() allocates a new one
+    when the free list is empty, so a missed release costs memory but never corrupts a frame.
+    """
+
+    def __init__(self, max_free=6):
+        self.max_free = max_free
+        self._free = []
+        self._lock = threading.Lock()
+        self.allocations = 0
+
+    def acquire(self, shape, dtype=np.uint8):
+        shape = tuple(shape)
+        with self._lock:
+            while self._free:
+                frame = self._free.pop()
+                if frame.shape == shape and frame.dtype == dtype:
+                    return frame
+            self.allocations += 1
+        return np.empty(shape, dtype=dtype)
+
+    def release(self, frame):
+        if frame is None:
+            return
+        with self._lock:
+            if len(self._free) < self.max_free and not any(f is frame for f in self._free):
+                self._free.append(frame)
+
+
+class PersistentPhoto:
+    """A single ImageTk.PhotoImage that is repainted in place while the image size is unchanged."""
+
+    def __init__(self):
+        self.photo = None
+        self.size = None
+        self.recreated = 0
+
+    def update(self, img_rgb):
+        """Show `img_rgb` (H, W, 3 uint8); returns the PhotoImage, which is a new object only on resize."""
+        img_rgb = np.ascontiguousarray(img_rgb)
+        height, width = img_rgb.shape[:2]
+        pil_img = Image.frombuffer("RGB", (width, height), img_rgb, "raw", "RGB", 0, 1)  # shares memory
+        if self.photo is None or self.size != (width, height):
+            self.photo = ImageTk.PhotoImage("RGB", (width, height))
+            self.size = (width, height)
+            self.recreated += 1
+        self.photo.paste(pil_img)
+        return self.photo
+
+
+class RenderCache:
+    """LRU of scaled base images and composited overlay layers, valid for one canvas size.
+
+    Keys describe the content (image hash, zoom view, display options); the canvas size is
+    tracked separately and every entry is evicted when it changes. Cached arrays are never
+    drawn into, so callers must build them into fresh arrays rather than pooled buffers.
+    """
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self.canvas_size = None
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def set_canvas_size(self, size):
+        """Returns True when the size changed and the cache was emptied."""
+        if size == self.canvas_size:
+            return False
+        self.canvas_size = size
+        self._entries.clear()
+        return True
+
+    def get(self, key, build):
+        """Cached value for `key`, calling build() to create it on a miss."""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = build()
+        self._entries[key] = value
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+    def nbytes(self):
+        return sum(part.nbytes for value in self._entries.values()
+                   for part in (value if isinstance(value, tuple) else (value,)) if isinstance(part, np.ndarray))
@@ -0,0 +1,192 @@
+"""Fast loading and zoomable display of large still images.
+
+ImageSource decodes a reduced copy of the photo for inference and the
+fit-to-window view, using OpenCV's IMREAD_REDUCED_* modes (scaled DCT for
+JPEG, so a 50 MP photo never has to be fully decoded before the first
+result). The full-resolution RGB pixels are decoded on a background thread
+into a memory-mapped scratch file and only used when the view is zoomed in
+past what the reduced copy can show.
+
+ZoomView maps between canvas pixels and image pixels for a zoom factor and
+center. render() resamples only the visible tile. It returns the tile's exact
+normalized rectangle, so normalized landmarks map onto it without rounding
+drift at any zoom level.
+"""
+import os
+import tempfile
+import threading
+
+import cv2
+import numpy as np
+from PIL import Image
+
+_REDUCED_MODES = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+
+def reduce_factor(width, height, max_dim):
+    """Largest decoder reduction (1, 2, 4 or 8) that keeps the longest side at least max_dim."""
+    longest = max(width, height)
+    for factor in (8, 4, 2):
+        if longest / factor >= max_dim:
+            return factor
+    return 1
+
+
+def header_size(path):
+    """(width, height) read from the file header alone, or None when PIL does not know the format."""
+    try:
+        with Image.open(path) as header:
+            return header.size
+    except (OSError, Image.DecompressionBombError):
+        return None
+
+
+class ImageSource:
+    def __init__(self, path, max_dim=800, upscale_limit=2.0):
+        """Decode `path` reduced to at most max_dim px; start the full-resolution decode if it is larger."""
+        self.path = path
+        self.upscale_limit = upscale_limit  # how far the reduced copy may be magnified before switching levels
+        size = header_size(path)
+        # Formats only OpenCV can read are decoded at full size, without the reduced fast path
+        factor = reduce_factor(*size, max_dim) if size is not None else 1
+        image = cv2.imread(path, _REDUCED_MODES[factor]) if factor > 1 else cv2.imread(path)
+        if image is None:
+            raise ValueError("Failed to open image file. Check if the format is supported by OpenCV "
+                             "and the file is not corrupted.")
+        width, height = size if size is not None else (image.shape[1], image.shape[0])
+        if (image.shape[1] > image.shape[0]) != (width > height):
+            width, height = height, width  # EXIF orientation applied by OpenCV
+        self.width, self.height = width, height
+        self.decode_factor = factor
+        scale = min(1.0, max_dim / max(image.shape[:2]))
+        if scale < 1.0:
+            image = cv2.resize(image, (round(image.shape[1] * scale), round(image.shape[0] * scale)),
+                               interpolation=cv2.INTER_AREA)
+        self.reduced = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        self.full = None  # (height, width, 3) uint8 memmap once decoded
+        self.error = None
+        self._scratch_path = None
+        self._closed = False
+        self.full_ready = threading.Event()
+        if self.reduced.shape[1] >= self.width:
+            self.full = self.reduced  # small image: the reduced decode already is full resolution
+            self.full_ready.set()
+        else:
+            threading.Thread(target=self._load_full, name="full-res-decode", daemon=True).start()
+
+    @property
+    def is_large(self):
+        return self.full is not self.reduced
+
+    def _load_full(self):
+        try:
+            image = cv2.imread(self.path)
+            if image is None:
+                raise ValueError("Failed to decode the full-resolution image")
+            fd, scratch_path = tempfile.mkstemp(prefix="landmark_selector_", suffix=".npy")
+            os.close(fd)
+            full = np.lib.format.open_memmap(scratch_path, mode="w+", dtype=np.uint8, shape=image.shape)
+            cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=full)
+            del image  # only the page-cache backed memmap stays around
+            full.flush()
+            self._scratch_path = scratch_path
+            self.height, self.width = full.shape[:2]
+            self.full = full
+            if self._closed:
+                self.close()
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.full_ready.set()
+
+    def close(self):
+        self._closed = True
+        if self._scratch_path is not None:
+            self.full = None
+            try:
+                os.remove(self._scratch_path)
+            except OSError:
+                pass
+            self._scratch_path = None
+
+    def level_for(self, scale):
+        """Pixels to resample from for `scale` canvas px per full-res px: the reduced copy when good enough."""
+        reduced_scale = self.reduced.shape[1] / self.width
+        full = self.full
+        if full is None or scale <= reduced_scale * self.upscale_limit:
+            return self.reduced
+        return full
+
+    def render(self, view, canvas_width, canvas_height):
+        """Resample the visible tile: returns (tile, (offset_x, offset_y), (x0, y0, x1, y1) normalized)."""
+        scale, (x0, y0, x1, y1), (display_w, display_h), offset = view.layout(canvas_width, canvas_height,
+                                                                              self.width, self.height)
+        level = self.level_for(scale)
+        level_h, level_w = level.shape[:2]
+        # Integer crop in level pixels; the returned rect is the crop's true extent, not the requested one
+        lx0, ly0 = int(np.floor(x0 * level_w)), int(np.floor(y0 * level_h))
+        lx1, ly1 = min(level_w, int(np.ceil(x1 * level_w))), min(level_h, int(np.ceil(y1 * level_h)))
+        crop = level[ly0:ly1, lx0:lx1]
+        interpolation = cv2.INTER_AREA if display_w < crop.shape[1] else cv2.INTER_LINEAR
+        tile = cv2.resize(crop, (display_w, display_h), interpolation=interpolation)
+        return tile, offset, (lx0 / level_w, ly0 / level_h, lx1 / level_w, ly1 / level_h)
+
+
+class ZoomView:
+    """Zoom factor (1 = fit to window) and view center in normalized image coordinates."""
+
+    def __init__(self, max_zoom=32.0):
+        self.max_zoom = max_zoom
+        self.reset()
+
+    def reset(self):
+        self.zoom = 1.0
+        self.center = (0.5, 0.5)
+
+    @property
+    def zoomed(self):
+        return self.zoom > 1.0
+
+    def layout(self, canvas_width, canvas_height, image_width, image_height):
+        """(scale, visible normalized rect, display size, canvas offset) for the current zoom and center."""
+        scale = min(canvas_width / image_width, canvas_height / image_height) * self.zoom
+        visible_w = min(1.0, canvas_width / (image_width * scale))
+        visible_h = min(1.0, canvas_height / (image_height * scale))
+        cx = min(max(self.center[0], visible_w / 2), 1.0 - visible_w / 2)
+        cy = min(max(self.center[1], visible_h / 2), 1.0 - visible_h / 2)
+        self.center = (cx, cy)
+        rect = (cx - visible_w / 2, cy - visible_h / 2, cx + visible_w / 2, cy + visible_h / 2)
+        display_w = max(1, round(visible_w * image_width * scale))
+        display_h = max(1, round(visible_h * image_height * scale))
+        offset = ((canvas_width - display_w) // 2, (canvas_height - display_h) // 2)
+        return scale, rect, (display_w, display_h), offset
+
+    def canvas_to_image(self, x, y, canvas_width, canvas_height, image_width, image_height):
+        """Normalized image coordinates under canvas pixel (x, y)."""
+        _, (x0, y0, x1, y1), (display_w, display_h), (ox, oy) = self.layout(
+            canvas_width, canvas_height, image_width, image_height)
+        return x0 + (x - ox) / display_w * (x1 - x0), y0 + (y - oy) / display_h * (y1 - y0)
+
+    def zoom_at(self, factor, x, y, canvas_width, canvas_height, image_width, image_height):
+        """Zoom by `factor`, keeping the image point under canvas pixel (x, y) fixed."""
+        size = (canvas_width, canvas_height, image_width, image_height)
+        u, v = self.canvas_to_image(x, y, *size)
+        self.zoom = min(max(1.0, self.zoom * factor), self.max_zoom)
+        u2, v2 = self.canvas_to_image(x, y, *size)
+        self.center = (self.center[0] + u - u2, self.center[1] + v - v2)
+        self.layout(*size)  # clamp the center
+
+    def pan(self, dx, dy, canvas_width, canvas_height, image_width, image_height):
+        """Move the view by (dx, dy) canvas pixels."""
+        scale = min(canvas_width / image_width, canvas_height / image_height) * self.zoom
+        self.center = (self.center[0] - dx / (image_width * scale), self.center[1] - dy / (image_height * scale))
+        self.layout(canvas_width, canvas_height, image_width, image_height)
+
+
+def to_view(faces, rect):
+    """Re-normalize (faces, N, 3) landmarks from the whole image to the tile covering `rect`."""
+    x0, y0, x1, y1 = rect
+    out = np.array(faces, dtype=np.float64)
+    out[..., 0] = (out[..., 0] - x0) / (x1 - x0)
+    out[..., 1] = (out[..., 1] - y0) / (y1 - y0)
+    return out
@@ -0,0 +1,168 @@
+"""Headless face mesh overlay renderer.
+
+Draws the tessellation / contour wireframe for one or more faces in a single
+batched cv2.polylines call per layer instead of one cv2.line per edge. Nothing in here
+touches Tk, so it can be used (and benchmarked) without a display.
+
+MediaPipe is only imported when the edge lists are first needed, so importing
+this module stays cheap.
+"""
+import threading
+
+import cv2
+import numpy as np
+
+NUM_LANDMARKS = 478
+
+# Landmarks pre-selected by "Select Default" in the GUI and --default-selection in landmark_batch
+DEFAULT_LANDMARK_INDICES = sorted(list(set([
+    0, 1, 2, 4, 5, 6, 7, 10, 13, 14, 17, 21, 30, 33, 37, 39, 40, 46, 48, 52, 53, 54, 55, 58,
+    61, 63, 65, 66, 67, 70, 78, 80, 81, 82, 84, 91, 93, 98, 103, 105, 107, 109, 127, 132,
+    133, 136, 144, 145, 146, 148, 149, 150, 152, 153, 154, 155, 157, 158, 159, 160, 161,
+    162, 163, 168, 172, 173, 176, 181, 191, 195, 197, 234, 246, 249, 251, 260, 263, 267,
+    269, 270, 276, 278, 282, 283, 284, 285, 288, 291, 293, 295, 296, 297, 300, 308, 310,
+    311, 312, 314, 321, 323, 327, 332, 334, 336, 338, 356, 361, 362, 365, 373, 374, 375,
+    377, 378, 379, 380, 381, 382, 384, 385, 386, 387, 388, 389, 390, 397, 398, 400, 405,
+    409, 415, 454, 466
+])))
+
+
+def _edge_array(connections):
+    # frozenset of (start, end) pairs -> sorted (E, 2) int32 index array
+    return np.array(sorted(connections), dtype=np.int32).reshape(-1, 2)
+
+
+_edges = None
+_edges_lock = threading.Lock()
+
+
+def mesh_edges():
+    """(tesselation, contour) int32 edge arrays, built once on first use."""
+    global _edges
+    if _edges is None:
+        with _edges_lock:
+            if _edges is None:
+                import mediapipe as mp
+                face_mesh = mp.solutions.face_mesh
+                _edges = (_edge_array(face_mesh.FACEMESH_TESSELATION), _edge_array(face_mesh.FACEMESH_CONTOURS))
+    return _edges
+
+
+def __getattr__(name):
+    # TESSELATION_EDGES / CONTOUR_EDGES stay importable as module attributes, resolved lazily
+    if name == "TESSELATION_EDGES":
+        return mesh_edges()[0]
+    if name == "CONTOUR_EDGES":
+        return mesh_edges()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def landmarks_to_array(face_landmarks):
+    """Convert a NormalizedLandmarkList (or anything array-like) to an (N, 3) float32 array."""
+    if isinstance(face_landmarks, np.ndarray):
+        return np.asarray(face_landmarks, dtype=np.float32).reshape(-1, 3)
+    return np.array([(lm.x, lm.y, lm.z) for lm in face_landmarks.landmark], dtype=np.float32).reshape(-1, 3)
+
+
+def faces_to_array(multi_face_landmarks):
+    """Stack every detected face into one (faces, N, 3) float32 array."""
+    return np.stack([landmarks_to_array(face) for face in multi_face_landmarks])
+
+
+def as_faces(landmarks):
+    """View (N, 3) single-face or (faces, N, 3) landmarks as (faces, N, 3)."""
+    if not isinstance(landmarks, np.ndarray):
+        landmarks = landmarks_to_array(landmarks)
+    return landmarks[None] if landmarks.ndim == 2 else landmarks
+
+
+class OverlayOptions:
+    def __init__(self, show_tesselation=True, show_contours=True,
+                 tesselation_color=(0, 255, 255), contour_color=(0, 255, 0),
+                 tesselation_thickness=1, contour_thickness=2, tesselation_alpha=0.4):
+        self.show_tesselation = show_tesselation
+        self.show_contours = show_contours
+        self.tesselation_color = tesselation_color
+        self.contour_color = contour_color
+        self.tesselation_thickness = tesselation_thickness
+        self.contour_thickness = contour_thickness
+        self.tesselation_alpha = tesselation_alpha
+
+
+class OverlayRenderer:
+    """Renders the wireframe overlay into buffers that are reused while the frame size is unchanged."""
+
+    def __init__(self, options=None):
+        self.options = options or OverlayOptions()
+        self._shape = None
+        self._output = None
+        self._overlay = None
+        self._valid_edges = {}  # landmark count -> (tesselation, contour) edges in range
+
+    def _ensure_buffers(self, shape):
+        if self._shape != shape:
+            self._shape = shape
+            self._output = np.empty(shape, dtype=np.uint8)
+            self._overlay = np.empty(shape, dtype=np.uint8)
+
+    def _edges_for(self, num_landmarks):
+        edges = self._valid_edges.get(num_landmarks)
+        if edges is None:
+            edges = tuple(e[e.max(axis=1) < num_landmarks] for e in mesh_edges())
+            self._valid_edges[num_landmarks] = edges
+        return edges
+
+    @staticmethod
+    def segments(points_px, edges):
+        """Gather (faces * E, 2, 2) int32 line segments from (faces, N, 2) pixel points."""
+        return np.ascontiguousarray(points_px[:, edges].reshape(-1, 2, 2))
+
+    def render(self, frame, landmarks, out=None):
+        """Draw the overlay for `landmarks` (normalized (N, 3), (faces, N, 3) or protobuf) on top of `frame`.
+
+        All faces are drawn together, one polylines call per layer.
+
+        The result is written to `out` if given, otherwise to an internal buffer that is
+        overwritten by the next call.
+        """
+        opts = self.options
+        height, width = frame.shape[:2]
+        if out is None:
+            self._ensure_buffers(frame.shape)
+            out = self._output
+        if out is not frame:
+            np.copyto(out, frame)
+
+        coords = as_faces(landmarks)
+        if coords.shape[0] == 0 or coords.shape[1] == 0 or not (opts.show_tesselation or opts.show_contours):
+            return out
+        points_px = (coords[..., :2] * (width, height)).astype(np.int32)
+        tesselation_edges, contour_edges = self._edges_for(coords.shape[1])
+
+        if opts.show_tesselation and len(tesselation_edges):
+            if self._overlay is None or self._overlay.shape != frame.shape:
+                self._overlay = np.empty(frame.shape, dtype=np.uint8)
+            overlay = self._overlay
+            np.copyto(overlay, out)
+            cv2.polylines(overlay, self.segments(points_px, tesselation_edges), False,
+                          opts.tesselation_color, opts.tesselation_thickness)
+            alpha = opts.tesselation_alpha
+            cv2.addWeighted(overlay, alpha, out, 1 - alpha, 0, dst=out)
+
+        if opts.show_contours and len(contour_edges):
+            cv2.polylines(out, self.segments(points_px, contour_edges), False,
+                          opts.contour_color, opts.contour_thickness)
+        return out
+
+
+_default_renderer = None
+
+
+def render_overlay(frame, landmarks, options=None):
+    """Headless entry point: returns a new image with the wireframe overlay drawn on `frame`."""
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = OverlayRenderer()
+    renderer = _default_renderer
+    renderer.options = options or OverlayOptions()
+    return renderer.render(frame, landmarks, out=np.empty_like(frame))
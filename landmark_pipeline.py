@@ -0,0 +1,246 @@
+"""Threaded capture -> inference pipeline with latest-frame-wins hand-off.
+
+Capture and inference each run on their own worker thread and talk through
+single-slot queues: a new item replaces whatever is still waiting, so a slow
+stage drops stale frames instead of building up a backlog. The Tk loop only
+polls for the newest finished result.
+"""
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from landmark_buffers import FramePool
+
+
+class LatestFrameQueue:
+    """Bounded single-slot queue; put() overwrites the pending item and counts it as dropped."""
+
+    def __init__(self, on_drop=None):
+        self._item = None
+        self._has_item = False
+        self._cond = threading.Condition()
+        self.on_drop = on_drop  # called with each overwritten or cleared item, e.g. to recycle its buffer
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            stale = self._item if self._has_item else None
+            if self._has_item:
+                self.dropped += 1
+            self._item = item
+            self._has_item = True
+            self._cond.notify()
+        if stale is not None and self.on_drop is not None:
+            self.on_drop(stale)
+
+    def get(self, timeout=None):
+        """Block until an item is available (or timeout); returns None on timeout."""
+        with self._cond:
+            if not self._has_item and not self._cond.wait_for(lambda: self._has_item, timeout):
+                return None
+            item, self._item, self._has_item = self._item, None, False
+            return item
+
+    def get_nowait(self):
+        return self.get(timeout=0)
+
+    def clear(self):
+        with self._cond:
+            stale = self._item if self._has_item else None
+            self._item = None
+            self._has_item = False
+        if stale is not None and self.on_drop is not None:
+            self.on_drop(stale)
+
+
+class SyntheticFrameSource:
+    """Stand-in for cv2.VideoCapture that renders a moving face-like pattern at a fixed rate."""
+
+    def __init__(self, width=640, height=480, fps=30.0, num_frames=None):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.num_frames = num_frames
+        self.frame_index = 0
+        self._opened = True
+        self._next_time = None
+        self._background = np.tile(np.linspace(40, 200, width, dtype=np.uint8)[None, :, None], (height, 1, 3))
+
+    def isOpened(self):
+        return self._opened
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        else:
+            return False
+        self._background = np.tile(np.linspace(40, 200, self.width, dtype=np.uint8)[None, :, None],
+                                   (self.height, 1, 3))
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        return 0.0
+
+    def read(self, image=None):
+        if not self._opened or (self.num_frames is not None and self.frame_index >= self.num_frames):
+            return False, None
+        if self.fps:
+            now = time.perf_counter()
+            if self._next_time is not None and now < self._next_time:
+                time.sleep(self._next_time - now)
+            self._next_time = max(now, self._next_time or now) + 1.0 / self.fps
+
+        if image is not None and image.shape == self._background.shape:
+            frame = image  # fill the caller's buffer, like cv2.VideoCapture.read(image)
+            np.copyto(frame, self._background)
+        else:
+            frame = self._background.copy()
+        t = self.frame_index / (self.fps or 30.0)
+        cx = int(self.width / 2 + self.width / 8 * np.sin(t))
+        cy = int(self.height / 2 + self.height / 16 * np.cos(t * 0.7))
+        face_w, face_h = self.width // 6, self.height // 4
+        cv2.ellipse(frame, (cx, cy), (face_w, face_h), 0, 0, 360, (150, 180, 220), -1)
+        for dx in (-face_w // 3, face_w // 3):
+            cv2.circle(frame, (cx + dx, cy - face_h // 4), max(2, face_w // 10), (40, 40, 40), -1)
+        cv2.ellipse(frame, (cx, cy + face_h // 2), (face_w // 3, max(2, face_h // 10)), 0, 0, 180,
+                    (60, 60, 160), -1)
+        self.frame_index += 1
+        return True, frame
+
+    def release(self):
+        self._opened = False
+
+
+class PipelineResult:
+    def __init__(self, frame_rgb, landmarks, capture_time, frame_index, inference_time=0.0):
+        self.frame_rgb = frame_rgb
+        self.landmarks = landmarks  # (N, 3) or (faces, N, 3) float32 array, or None when no face was found
+        self.capture_time = capture_time
+        self.frame_index = frame_index
+        self.inference_time = inference_time  # seconds spent in infer_landmarks on the worker
+
+
+class FramePipeline:
+    """Runs capture and inference on worker threads; the UI thread calls poll() for results."""
+
+    def __init__(self, source, infer_landmarks, flip=True, latency_window=60, profiler=None,
+                 keyframe_scheduler=None):
+        self.source = source
+        self.infer_landmarks = infer_landmarks  # rgb frame -> landmarks array or None, called on the worker
+        self.flip = flip
+        self.profiler = profiler  # optional StageProfiler fed from the worker threads
+        self.keyframe_scheduler = keyframe_scheduler  # optional KeyframeScheduler, consulted on the worker
+        self.frame_pool = FramePool()
+        self.capture_queue = LatestFrameQueue(on_drop=lambda item: self.frame_pool.release(item[0]))
+        self.result_queue = LatestFrameQueue(on_drop=lambda result: self.frame_pool.release(result.frame_rgb))
+        self.latencies = deque(maxlen=latency_window)
+        self.frames_captured = 0
+        self.frames_processed = 0
+        self.frames_skipped = 0
+        self.frames_displayed = 0
+        self.error = None
+        self._stop = threading.Event()
+        self._threads = []
+
+    @property
+    def running(self):
+        return any(t.is_alive() for t in self._threads)
+
+    @property
+    def dropped_frames(self):
+        return self.capture_queue.dropped + self.result_queue.dropped
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+        self.capture_queue.clear()
+        self.result_queue.clear()
+
+    def release_frame(self, frame_rgb):
+        """Hand a displayed frame back to the pool once the UI no longer needs it."""
+        self.frame_pool.release(frame_rgb)
+
+    def _capture_loop(self):
+        raw_frame = None  # capture-thread scratch buffer, refilled in place by read()
+        while not self._stop.is_set():
+            read_start = time.perf_counter()
+            ret, raw_frame = self.source.read(raw_frame)
+            if not ret:
+                self.error = "Could not read frame from source"
+                self._stop.set()
+                break
+            capture_time = time.perf_counter()
+            # Only pooled frames cross threads; flip and convert write straight into one
+            rgb_frame = self.frame_pool.acquire(raw_frame.shape)
+            if self.flip:
+                cv2.flip(raw_frame, 1, dst=rgb_frame)
+                cv2.cvtColor(rgb_frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
+            else:
+                cv2.cvtColor(raw_frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
+            if self.profiler is not None:
+                self.profiler.record("capture", capture_time - read_start, capture_time)
+                self.profiler.record("convert", time.perf_counter() - capture_time)
+            self.capture_queue.put((rgb_frame, capture_time, self.frames_captured))
+            self.frames_captured += 1
+
+    def _inference_loop(self):
+        while not self._stop.is_set():
+            item = self.capture_queue.get(timeout=0.1)
+            if item is None:
+                continue
+            rgb_frame, capture_time, frame_index = item
+            if self.keyframe_scheduler is not None and not self.keyframe_scheduler.is_keyframe(capture_time):
+                self.frame_pool.release(rgb_frame)
+                self.frames_skipped += 1
+                continue
+            try:
+                inference_start = time.perf_counter()
+                landmarks = self.infer_landmarks(rgb_frame)
+                inference_time = time.perf_counter() - inference_start
+                if self.profiler is not None:
+                    self.profiler.record("inference", inference_time)
+            except Exception as e:
+                self.error = f"Error processing frame: {str(e)}"
+                self._stop.set()
+                break
+            self.result_queue.put(PipelineResult(rgb_frame, landmarks, capture_time, frame_index, inference_time))
+            self.frames_processed += 1
+
+    def poll(self):
+        """Return the newest finished result (or None) and record its end-to-end latency."""
+        result = self.result_queue.get_nowait()
+        if result is not None:
+            self.latencies.append(time.perf_counter() - result.capture_time)
+            self.frames_displayed += 1
+        return result
+
+    def mean_latency_ms(self):
+        return 1000.0 * sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    def status_text(self):
+        return (f"Pipeline - latency {self.mean_latency_ms():.0f} ms | "
+                f"dropped {self.dropped_frames} "
+                f"(capture {self.capture_queue.dropped}, display {self.result_queue.dropped}) | "
+                f"processed {self.frames_processed}/{self.frames_captured}")
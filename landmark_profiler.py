@@ -0,0 +1,138 @@
+"""Per-stage frame timing with fixed-size ring buffers.
+
+    profiler = StageProfiler()
+    with profiler.stage("inference"):
+        results = face_mesh.process(frame)
+    profiler.frame_done()
+    print(profiler.format_summary())
+    profiler.dump("trace.json")  # or trace.csv
+
+Stages can be recorded from any thread.
+"""
+import csv
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# Display order for the HUD; stages not listed here are appended in first-seen order
+STAGE_ORDER = ("capture", "convert", "inference", "resize", "overlay", "photo", "canvas")
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of (timestamp, duration) samples; old samples are overwritten."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+
+    def append(self, timestamp, value):
+        i = self.count % self.capacity
+        self.timestamps[i] = timestamp
+        self.values[i] = value
+        self.count += 1
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def ordered(self):
+        """Return (timestamps, values) oldest first."""
+        n = len(self)
+        if self.count <= self.capacity:
+            return self.timestamps[:n].copy(), self.values[:n].copy()
+        start = self.count % self.capacity
+        return np.roll(self.timestamps, -start), np.roll(self.values, -start)
+
+
+class StageProfiler:
+    def __init__(self, capacity=300):
+        self.capacity = capacity
+        self.stages = {}
+        self.frames = RingBuffer(capacity)  # timestamps of completed frames, value = frame time
+        self._lock = threading.Lock()
+        self._last_frame_time = None
+
+    def record(self, stage, seconds, timestamp=None):
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        with self._lock:
+            buffer = self.stages.get(stage)
+            if buffer is None:
+                buffer = self.stages[stage] = RingBuffer(self.capacity)
+            buffer.append(timestamp, seconds)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.record(name, end - start, end)
+
+    def frame_done(self):
+        now = time.perf_counter()
+        with self._lock:
+            frame_time = now - self._last_frame_time if self._last_frame_time is not None else 0.0
+            self.frames.append(now, frame_time)
+            self._last_frame_time = now
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.frames = RingBuffer(self.capacity)
+            self._last_frame_time = None
+
+    def stage_names(self):
+        names = [name for name in STAGE_ORDER if name in self.stages]
+        return names + [name for name in self.stages if name not in STAGE_ORDER]
+
+    def fps(self):
+        with self._lock:
+            timestamps, _ = self.frames.ordered()
+        if len(timestamps) < 2 or timestamps[-1] <= timestamps[0]:
+            return 0.0
+        return (len(timestamps) - 1) / (timestamps[-1] - timestamps[0])
+
+    def summary(self):
+        """Rolling statistics in milliseconds: {stage: {"p50", "p95", "mean", "count"}} plus "fps"."""
+        stats = {}
+        with self._lock:
+            snapshots = {name: self.stages[name].values[:len(self.stages[name])].copy()
+                         for name in self.stage_names()}
+        for name, values in snapshots.items():
+            if not len(values):
+                continue
+            p50, p95 = np.percentile(values, (50, 95)) * 1000.0
+            stats[name] = {"p50": float(p50), "p95": float(p95), "mean": float(values.mean() * 1000.0),
+                           "count": int(len(values))}
+        return {"fps": self.fps(), "stages": stats}
+
+    def format_summary(self):
+        summary = self.summary()
+        lines = [f"FPS: {summary['fps']:.1f}", f"{'stage':<14}{'p50':>8}{'p95':>8}"]
+        for name, stats in summary["stages"].items():
+            lines.append(f"{name:<14}{stats['p50']:>6.1f}ms{stats['p95']:>6.1f}ms")
+        return "\n".join(lines)
+
+    def dump(self, filepath):
+        """Write the buffered samples as JSON (with a summary) or as CSV rows (stage, timestamp, ms)."""
+        with self._lock:
+            samples = {name: self.stages[name].ordered() for name in self.stage_names()}
+        if filepath.lower().endswith(".csv"):
+            with open(filepath, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["stage", "timestamp", "ms"])
+                for name, (timestamps, values) in samples.items():
+                    writer.writerows((name, f"{t:.6f}", f"{v * 1000.0:.3f}") for t, v in zip(timestamps, values))
+        else:
+            trace = {
+                "summary": self.summary(),
+                "samples": {name: {"timestamp": timestamps.tolist(), "ms": (values * 1000.0).tolist()}
+                            for name, (timestamps, values) in samples.items()},
+            }
+            with open(filepath, "w") as f:
+                json.dump(trace, f, indent=1)
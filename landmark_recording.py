@@ -0,0 +1,206 @@
+"""Streaming recordings of the selected landmark coordinates.
+
+A recording is a directory of fixed-size chunks:
+
+    session.lmrec/
+        meta.json             indices, faces, chunk size, frames written
+        coords_00000.npy      (chunk_frames, faces, len(indices), 3) float32, NaN = no face
+        times_00000.npy       (chunk_frames,) float64 seconds since the first frame
+        ...
+
+The UI thread only gathers the selected columns (a few hundred bytes per frame)
+and hands them to a writer thread, which fills the preallocated chunk memmaps
+and flushes them, so disk I/O never runs on the Tk loop. read_recording() loads
+a recording back as contiguous arrays.
+
+    python -m landmark_recording session.lmrec
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+from landmark_overlay import as_faces
+
+FORMAT_VERSION = 1
+
+
+def _chunk_paths(path, chunk):
+    return os.path.join(path, f"coords_{chunk:05d}.npy"), os.path.join(path, f"times_{chunk:05d}.npy")
+
+
+class LandmarkRecorder:
+    """Appends the `indices` columns of every frame's landmarks to a chunked recording at `path`."""
+
+    def __init__(self, path, indices, max_faces=1, chunk_frames=1024, flush_every=1.0):
+        self.path = path
+        self.indices = np.asarray(sorted(indices), dtype=np.intp)
+        if not len(self.indices):
+            raise ValueError("No landmark indices to record")
+        self.max_faces = max_faces
+        self.chunk_frames = chunk_frames
+        self.flush_every = flush_every  # seconds between flushes of the open chunk
+        self.frames_written = 0
+        self.frames_queued = 0
+        self.max_backlog = 0
+        self.error = None
+        self.started_at = time.time()
+        self._first_timestamp = None
+        self._queue = queue.Queue()
+        self._coords = None
+        self._times = None
+        self._chunk = -1
+        os.makedirs(path, exist_ok=True)
+        self._write_meta()
+        self._thread = threading.Thread(target=self._run, name="landmark-recorder", daemon=True)
+        self._thread.start()
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def append(self, landmarks, timestamp):
+        """Queue one frame; `landmarks` is (N, 3), (faces, N, 3) or None when no face was found."""
+        if self.error is not None:
+            return
+        if self._first_timestamp is None:
+            self._first_timestamp = timestamp
+        frame = np.full((self.max_faces, len(self.indices), 3), np.nan, dtype=np.float32)
+        if landmarks is not None:
+            faces = as_faces(landmarks)[:self.max_faces]
+            frame[:len(faces)] = faces[:, self.indices]
+        self._queue.put((frame, timestamp - self._first_timestamp))
+        self.frames_queued += 1
+        self.max_backlog = max(self.max_backlog, self._queue.qsize())
+
+    def close(self, timeout=5.0):
+        """Write out everything queued so far and finalize the recording."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _open_chunk(self, chunk):
+        coords_path, times_path = _chunk_paths(self.path, chunk)
+        self._coords = np.lib.format.open_memmap(coords_path, mode="w+", dtype=np.float32,
+                                                 shape=(self.chunk_frames, self.max_faces, len(self.indices), 3))
+        self._coords[:] = np.nan
+        self._times = np.lib.format.open_memmap(times_path, mode="w+", dtype=np.float64, shape=(self.chunk_frames,))
+        self._chunk = chunk
+
+    def _flush(self):
+        if self._coords is not None:
+            self._coords.flush()
+            self._times.flush()
+        self._write_meta()
+
+    def _write_meta(self):
+        tmp_path = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"version": FORMAT_VERSION, "indices": self.indices.tolist(), "max_faces": self.max_faces,
+                       "chunk_frames": self.chunk_frames, "frames": self.frames_written,
+                       "started_at": self.started_at}, f)
+        os.replace(tmp_path, os.path.join(self.path, "meta.json"))
+
+    def _run(self):
+        last_flush = time.perf_counter()
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.flush_every)
+                except queue.Empty:
+                    item = ()
+                if item is None:
+                    break
+                if item:
+                    frame, timestamp = item
+                    chunk, row = divmod(self.frames_written, self.chunk_frames)
+                    if chunk != self._chunk:
+                        self._flush()
+                        self._open_chunk(chunk)
+                    self._coords[row] = frame
+                    self._times[row] = timestamp
+                    self.frames_written += 1
+                if time.perf_counter() - last_flush >= self.flush_every:
+                    self._flush()
+                    last_flush = time.perf_counter()
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self._flush()
+            self._coords = self._times = None
+
+    def status_text(self):
+        return f"Recording {self.frames_written}/{self.frames_queued} frames"
+
+
+class LandmarkRecording:
+    """Read-only view of a recording; chunks are memory-mapped and only concatenated on demand."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording version: {meta.get('version')}")
+        self.indices = np.asarray(meta["indices"], dtype=np.intp)
+        self.max_faces = meta["max_faces"]
+        self.chunk_frames = meta["chunk_frames"]
+        self.frames = meta["frames"]
+        self.started_at = meta["started_at"]
+
+    def __len__(self):
+        return self.frames
+
+    def chunks(self):
+        """Yield (coords, timestamps) memmaps per chunk, trimmed to the frames actually written."""
+        remaining = self.frames
+        chunk = 0
+        while remaining > 0:
+            coords_path, times_path = _chunk_paths(self.path, chunk)
+            count = min(remaining, self.chunk_frames)
+            yield np.load(coords_path, mmap_mode="r")[:count], np.load(times_path, mmap_mode="r")[:count]
+            remaining -= count
+            chunk += 1
+
+    def load(self):
+        """(timestamps (T,), coords (T, faces, len(indices), 3)) as in-memory arrays."""
+        parts = list(self.chunks())
+        if not parts:
+            return (np.empty(0, dtype=np.float64),
+                    np.empty((0, self.max_faces, len(self.indices), 3), dtype=np.float32))
+        return np.concatenate([t for _, t in parts]), np.concatenate([c for c, _ in parts])
+
+
+def read_recording(path):
+    """Load a recording: returns (indices, timestamps, coords)."""
+    recording = LandmarkRecording(path)
+    timestamps, coords = recording.load()
+    return recording.indices, timestamps, coords
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a landmark recording")
+    parser.add_argument("path", help="Recording directory (*.lmrec)")
+    parser.add_argument("--export", help="Also save timestamps, indices and coords to this .npz file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    indices, timestamps, coords = read_recording(args.path)
+    duration = timestamps[-1] if len(timestamps) else 0.0
+    detected = int(np.count_nonzero(~np.isnan(coords[:, 0, 0, 0]))) if len(coords) else 0
+    print(f"{len(timestamps)} frames over {duration:.2f}s, {len(indices)} landmarks, "
+          f"{coords.shape[1]} face slot(s), face found in {detected} frames")
+    if args.export:
+        np.savez(args.export, indices=indices, timestamps=timestamps, coords=coords)
+        print(f"Wrote {args.export}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""ROI tracking inference: run FaceMesh on a padded, downscaled crop around the last face.
+
+Once a face has been found on the full frame, later frames are cropped to the
+previous landmarks' bounding box (plus padding), downscaled to `target_size`,
+and the resulting landmarks are mapped back to full-frame normalized
+coordinates. When the face is lost the tracker falls back to full-frame
+detection on the same frame.
+"""
+import cv2
+import numpy as np
+
+from landmark_overlay import landmarks_to_array
+
+
+def landmarks_bbox(landmarks, width, height, padding):
+    """Square, padded pixel bounding box (x0, y0, x1, y1) of normalized landmarks, clipped to the frame."""
+    xs = landmarks[:, 0] * width
+    ys = landmarks[:, 1] * height
+    cx, cy = (xs.min() + xs.max()) / 2, (ys.min() + ys.max()) / 2
+    half = max(xs.max() - xs.min(), ys.max() - ys.min()) * (0.5 + padding)
+    x0, y0 = int(max(0, cx - half)), int(max(0, cy - half))
+    x1, y1 = int(min(width, cx + half)), int(min(height, cy + half))
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return None
+    return x0, y0, x1, y1
+
+
+class RoiTracker:
+    def __init__(self, full_face_mesh, roi_face_mesh, target_size=256, padding=0.25):
+        # Separate instances so the crop-space tracking state never mixes with full-frame detection
+        self.full_face_mesh = full_face_mesh
+        self.roi_face_mesh = roi_face_mesh
+        self.target_size = target_size
+        self.padding = padding
+        self.roi = None  # Only written by the thread calling process()
+        self.reset_requested = False  # Set from any thread; consumed by the next process() call
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.lost_count = 0
+
+    def reset(self):
+        """Drop the current ROI; safe to call while another thread is inside process()."""
+        self.reset_requested = True
+
+    def process_full(self, frame_rgb):
+        self.full_frames += 1
+        results = self.full_face_mesh.process(frame_rgb)
+        if not results.multi_face_landmarks:
+            return None
+        return landmarks_to_array(results.multi_face_landmarks[0])
+
+    def process_roi(self, frame_rgb, roi):
+        height, width = frame_rgb.shape[:2]
+        x0, y0, x1, y1 = roi
+        crop = frame_rgb[y0:y1, x0:x1]
+        crop_w, crop_h = x1 - x0, y1 - y0
+        scale = min(1.0, self.target_size / max(crop_w, crop_h))
+        if scale < 1.0:
+            crop = cv2.resize(crop, (max(1, int(crop_w * scale)), max(1, int(crop_h * scale))),
+                              interpolation=cv2.INTER_AREA)
+        else:
+            crop = np.ascontiguousarray(crop)
+        self.roi_frames += 1
+        results = self.roi_face_mesh.process(crop)
+        if not results.multi_face_landmarks:
+            return None
+        landmarks = landmarks_to_array(results.multi_face_landmarks[0])
+        # Crop-normalized -> full-frame-normalized; z shares x's scale in MediaPipe
+        landmarks[:, 0] = (landmarks[:, 0] * crop_w + x0) / width
+        landmarks[:, 1] = (landmarks[:, 1] * crop_h + y0) / height
+        landmarks[:, 2] *= crop_w / width
+        return landmarks
+
+    def process(self, frame_rgb):
+        """Return (N, 3) full-frame normalized landmarks, or None when no face is found."""
+        if self.reset_requested:
+            self.reset_requested = False
+            self.roi = None
+        roi = self.roi
+        landmarks = None
+        if roi is not None:
+            landmarks = self.process_roi(frame_rgb, roi)
+            if landmarks is None:
+                self.lost_count += 1
+        if landmarks is None:
+            landmarks = self.process_full(frame_rgb)
+        if self.reset_requested:
+            return landmarks  # reset arrived mid-frame: leave the ROI for the next call to drop
+        height, width = frame_rgb.shape[:2]
+        self.roi = None if landmarks is None else landmarks_bbox(landmarks, width, height, self.padding)
+        return landmarks
+
+    def status_text(self):
+        total = self.roi_frames + self.full_frames
+        share = 100.0 * self.roi_frames / total if total else 0.0
+        return f"ROI {share:.0f}% of inferences, lost {self.lost_count}x"
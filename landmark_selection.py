@@ -0,0 +1,72 @@
+"""Vectorized hit-testing and region selection for on-canvas landmarks.
+
+LandmarkGrid buckets the (N, 2) canvas positions into square cells once per
+frame, so click / hover lookups only look at the 3x3 cells around the cursor.
+Box and lasso selection test every landmark at once with NumPy.
+"""
+import numpy as np
+
+
+class LandmarkGrid:
+    def __init__(self, points, cell_size=16):
+        """Index (N, 2) canvas points; cell_size should be at least the pick radius."""
+        self.points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        self.cell_size = cell_size
+        self.cells = {}
+        if not len(self.points):
+            return
+        cell_xy = np.floor(self.points / cell_size).astype(np.int64)
+        keys = cell_xy[:, 0] * 1_000_003 + cell_xy[:, 1]
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(order)]))
+        self.cells = {int(sorted_keys[s]): order[s:e] for s, e in zip(starts, ends)}
+
+    def __len__(self):
+        return len(self.points)
+
+    def candidates(self, x, y):
+        cx, cy = int(np.floor(x / self.cell_size)), int(np.floor(y / self.cell_size))
+        found = [self.cells.get((cx + dx) * 1_000_003 + cy + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+        found = [c for c in found if c is not None]
+        return np.concatenate(found) if found else np.empty(0, dtype=np.intp)
+
+    def nearest(self, x, y, max_distance):
+        """Index of the point nearest to (x, y) strictly within max_distance, or None."""
+        if max_distance > self.cell_size:
+            candidates = np.arange(len(self.points))
+        else:
+            candidates = self.candidates(x, y)
+        if not len(candidates):
+            return None
+        d = self.points[candidates] - (x, y)
+        dist_sq = np.einsum("ij,ij->i", d, d)
+        best = int(np.argmin(dist_sq))
+        if dist_sq[best] >= max_distance ** 2:
+            return None
+        return int(candidates[best])
+
+
+def points_in_rect(points, x0, y0, x1, y1):
+    """Boolean mask of (N, 2) points inside the axis-aligned rectangle spanned by two corners."""
+    x0, x1 = min(x0, x1), max(x0, x1)
+    y0, y1 = min(y0, y1), max(y0, y1)
+    return (points[:, 0] >= x0) & (points[:, 0] <= x1) & (points[:, 1] >= y0) & (points[:, 1] <= y1)
+
+
+def points_in_polygon(points, polygon):
+    """Boolean mask of (N, 2) points inside a closed (M, 2) polygon (even-odd rule, all edges at once)."""
+    polygon = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+    if len(polygon) < 3:
+        return np.zeros(len(points), dtype=bool)
+    px = points[:, 0:1].astype(np.float64)
+    py = points[:, 1:2].astype(np.float64)
+    x0, y0 = polygon[:, 0], polygon[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+    straddles = (y0 <= py) != (y1 <= py)  # (N, M) edges crossing each point's horizontal ray
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cross = x0 + (py - y0) * (x1 - x0) / (y1 - y0)
+    crossings = straddles & (px < x_cross)
+    return np.count_nonzero(crossings, axis=1) % 2 == 1
@@ -0,0 +1,389 @@
+"""Local landmark streaming for other processes on the same machine.
+
+LandmarkServer runs an asyncio server on a background thread, over a Unix
+domain socket or localhost TCP, and broadcasts every published frame to all
+connected subscribers. Each frame is encoded once:
+
+    header   <4sIdHHH  magic b"LMK1", frame index, timestamp, faces, count, flags
+    indices  count x uint16            only when flags & FLAG_SUBSET
+    coords   faces x count x 3 float32 normalized x, y, z
+
+Every subscriber has a small latest-frames queue. A slow subscriber loses its
+oldest frames (counted in `dropped`) instead of stalling capture or the other
+subscribers. LandmarkClient is a minimal blocking reader for the format.
+
+    python -m landmark_server --load-test --clients 100 --slow 10
+"""
+import argparse
+import asyncio
+import os
+import socket
+import stat
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from landmark_overlay import NUM_LANDMARKS, as_faces
+
+MAGIC = b"LMK1"
+HEADER = struct.Struct("<4sIdHHH")
+FLAG_SUBSET = 1
+
+
+def encode_frame(landmarks, frame_index, timestamp, indices=None):
+    """Encode (N, 3) / (faces, N, 3) landmarks (or None for no face) as one binary message."""
+    if landmarks is None:
+        coords = np.empty((0, 0 if indices is None else len(indices), 3), dtype=np.float32)
+    else:
+        coords = as_faces(landmarks)
+        if indices is not None:
+            coords = coords[:, indices]
+    coords = np.ascontiguousarray(coords, dtype=np.float32)
+    faces, count = coords.shape[:2]
+    flags = 0 if indices is None else FLAG_SUBSET
+    parts = [HEADER.pack(MAGIC, frame_index & 0xFFFFFFFF, timestamp, faces, count, flags)]
+    if indices is not None:
+        parts.append(np.asarray(indices, dtype="<u2").tobytes())
+    parts.append(coords.astype("<f4", copy=False).tobytes())
+    return b"".join(parts)
+
+
+def parse_address(address):
+    """"unix:/path", "/path" or "./path" -> ("unix", path); "host:port" or ":port" -> ("tcp", (host, port))."""
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    if address.startswith(("/", ".")):
+        return "unix", address
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+class LandmarkFrame:
+    def __init__(self, frame_index, timestamp, indices, coords):
+        self.frame_index = frame_index
+        self.timestamp = timestamp
+        self.indices = indices  # landmark index of each coords column
+        self.coords = coords  # (faces, count, 3) float32; zero faces when none was found
+
+
+class _Subscriber:
+    def __init__(self, writer, max_queue):
+        self.writer = writer
+        self.pending = deque(maxlen=max_queue)
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+
+    def offer(self, data):
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1  # the deque discards the oldest frame
+        self.pending.append(data)
+        self.ready.set()
+
+
+class LandmarkServer:
+    """Broadcasts published frames to every connected subscriber from a background event loop."""
+
+    def __init__(self, address, max_queue=2, write_buffer=64 * 1024):
+        self.address = address
+        self.kind, self.target = parse_address(address)
+        self.max_queue = max_queue  # frames a subscriber may lag behind before its oldest are dropped
+        self.write_buffer = write_buffer
+        self.frames_published = 0
+        self.error = None
+        self._subscribers = set()
+        self._loop = asyncio.new_event_loop()
+        self._server = None
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="landmark-server", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self.error:
+            raise OSError(self.error)
+
+    @property
+    def num_clients(self):
+        return len(self._subscribers)
+
+    @property
+    def bound_address(self):
+        """Actual listening address (resolves port 0 for TCP)."""
+        if self.kind == "unix":
+            return self.target
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"{host}:{port}"
+
+    def publish(self, landmarks, timestamp=None, indices=None):
+        """Queue one frame for every subscriber; safe to call from any thread and never blocks on I/O."""
+        timestamp = time.time() if timestamp is None else timestamp
+        data = encode_frame(landmarks, self.frames_published, timestamp, indices)
+        self.frames_published += 1
+        if self._subscribers:
+            self._loop.call_soon_threadsafe(self._broadcast, data)
+
+    def stats(self):
+        """(sent, dropped) per connected subscriber."""
+        return [(s.sent, s.dropped) for s in list(self._subscribers)]
+
+    def close(self, timeout=2.0):
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        self._thread.join(timeout)
+
+    def status_text(self):
+        dropped = sum(d for _, d in self.stats())
+        return f"Serving {self.num_clients} client(s), dropped {dropped}"
+
+    def _broadcast(self, data):
+        for subscriber in self._subscribers:
+            subscriber.offer(data)
+
+    async def _handle(self, reader, writer):
+        # Keep both the transport and kernel send buffers small, so a stalled reader shows up as
+        # drain() blocking (and frames being dropped) instead of seconds of queued data
+        writer.transport.set_write_buffer_limits(high=self.write_buffer)
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.write_buffer)
+        subscriber = _Subscriber(writer, self.max_queue)
+        self._subscribers.add(subscriber)
+        try:
+            while True:
+                await subscriber.ready.wait()
+                subscriber.ready.clear()
+                while subscriber.pending:
+                    writer.write(subscriber.pending.popleft())
+                    subscriber.sent += 1
+                # Frames published while waiting for a slow reader pile up in `pending` and get dropped
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._subscribers.discard(subscriber)
+            writer.close()
+
+    def _remove_stale_socket(self):
+        """Unlink the --serve path only if it is a socket that nobody is listening on."""
+        try:
+            mode = os.stat(self.target).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise OSError(f"{self.target} exists and is not a socket")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.target)
+        except ConnectionRefusedError:
+            os.unlink(self.target)  # stale socket from an earlier run
+            return
+        finally:
+            probe.close()
+        raise OSError(f"Another server is already listening on {self.target}")
+
+    async def _start(self):
+        if self.kind == "unix":
+            self._remove_stale_socket()
+            self._server = await asyncio.start_unix_server(self._handle, path=self.target)
+        else:
+            host, port = self.target
+            self._server = await asyncio.start_server(self._handle, host, port)
+
+    async def _shutdown(self):
+        self._server.close()
+        handlers = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        self._loop.stop()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._start())
+        except Exception as e:
+            self.error = str(e)
+            self._started.set()
+            return
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            if self.kind == "unix" and os.path.exists(self.target):
+                os.unlink(self.target)
+            self._loop.close()
+
+
+def _recv_exactly(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise ConnectionError("Server closed the connection")
+        received += n
+    return buffer
+
+
+def decode_header(data):
+    magic, frame_index, timestamp, faces, count, flags = HEADER.unpack(data)
+    if magic != MAGIC:
+        raise ValueError("Not a landmark stream (bad magic)")
+    return frame_index, timestamp, faces, count, flags
+
+
+class LandmarkClient:
+    """Blocking subscriber: `for frame in LandmarkClient("/tmp/landmarks.sock"): ...`."""
+
+    def __init__(self, address, timeout=None):
+        kind, target = parse_address(address)
+        self.sock = socket.socket(socket.AF_UNIX if kind == "unix" else socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(target)
+
+    def recv(self):
+        """Next LandmarkFrame; raises ConnectionError when the server goes away."""
+        frame_index, timestamp, faces, count, flags = decode_header(_recv_exactly(self.sock, HEADER.size))
+        if flags & FLAG_SUBSET:
+            indices = np.frombuffer(_recv_exactly(self.sock, 2 * count), dtype="<u2").astype(np.intp)
+        else:
+            indices = np.arange(count)
+        coords = np.frombuffer(_recv_exactly(self.sock, 12 * faces * count), dtype="<f4").reshape(faces, count, 3)
+        return LandmarkFrame(frame_index, timestamp, indices, coords)
+
+    def __iter__(self):
+        try:
+            while True:
+                yield self.recv()
+        except ConnectionError:
+            return
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def read_frame(reader):
+    """asyncio counterpart of LandmarkClient.recv() for a StreamReader."""
+    frame_index, timestamp, faces, count, flags = decode_header(await reader.readexactly(HEADER.size))
+    indices = np.arange(count)
+    if flags & FLAG_SUBSET:
+        indices = np.frombuffer(await reader.readexactly(2 * count), dtype="<u2").astype(np.intp)
+    coords = np.frombuffer(await reader.readexactly(12 * faces * count), dtype="<f4").reshape(faces, count, 3)
+    return LandmarkFrame(frame_index, timestamp, indices, coords)
+
+
+async def _subscribe(address, stop, delay, counts, latencies):
+    kind, target = parse_address(address)
+    sock = socket.socket(socket.AF_UNIX if kind == "unix" else socket.AF_INET, socket.SOCK_STREAM)
+    if delay:
+        # Small buffers so a slow consumer backs up into the server's queue within seconds
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 16 * 1024)
+    sock.connect(target)
+    sock.setblocking(False)
+    if kind == "unix":
+        reader, writer = await asyncio.open_unix_connection(sock=sock, limit=16 * 1024)
+    else:
+        reader, writer = await asyncio.open_connection(sock=sock, limit=16 * 1024)
+    try:
+        while not stop.is_set():
+            frame = await read_frame(reader)
+            latencies.append(time.time() - frame.timestamp)
+            counts[0] += 1
+            if delay:
+                await asyncio.sleep(delay)  # a deliberately slow consumer
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _run_subscribers(address, clients, slow, slow_delay, stop, counts, latencies):
+    await asyncio.gather(*[_subscribe(address, stop, slow_delay if i < slow else 0.0, counts[i], latencies[i])
+                           for i in range(clients)])
+
+
+def load_test(address, clients=50, slow=5, fps=60.0, seconds=5.0, subset=None, slow_delay=0.1):
+    """Publish synthetic frames at `fps` to `clients` subscribers (the first `slow` of them lagging)."""
+    server = LandmarkServer(address)
+    address = server.bound_address if server.kind == "tcp" else address
+    stop = threading.Event()
+    counts = [[0] for _ in range(clients)]
+    latencies = [[] for _ in range(clients)]
+    subscriber_thread = threading.Thread(
+        target=lambda: asyncio.run(_run_subscribers(address, clients, slow, slow_delay, stop, counts, latencies)),
+        daemon=True)
+    subscriber_thread.start()
+    deadline = time.perf_counter() + 5.0
+    while server.num_clients < clients and time.perf_counter() < deadline:
+        time.sleep(0.01)
+
+    rng = np.random.default_rng(0)
+    landmarks = rng.random((NUM_LANDMARKS, 3), dtype=np.float32)
+    indices = None if subset is None else np.arange(subset)
+    publish_times = []
+    frames = int(seconds * fps)
+    start = time.perf_counter()
+    for i in range(frames):
+        t0 = time.perf_counter()
+        server.publish(landmarks, indices=indices)
+        publish_times.append(time.perf_counter() - t0)
+        time.sleep(max(0.0, start + (i + 1) / fps - time.perf_counter()))
+    elapsed = time.perf_counter() - start
+    time.sleep(0.2)
+    stats = server.stats()
+    stop.set()
+    server.close()
+    subscriber_thread.join(2.0)
+
+    received = np.array([c[0] for c in counts])
+    fast, lagging = received[slow:], received[:slow]
+    all_latencies = np.concatenate([np.asarray(l) for l in latencies[slow:] if l]) if clients > slow else []
+    return {
+        "clients": clients, "slow_clients": slow, "connected": len(stats), "frames_published": frames,
+        "publish_fps": frames / elapsed,
+        "publish_p50_us": float(np.percentile(publish_times, 50) * 1e6),
+        "publish_p95_us": float(np.percentile(publish_times, 95) * 1e6),
+        "fast_received_min": int(fast.min()) if len(fast) else 0,
+        "slow_received_max": int(lagging.max()) if len(lagging) else 0,
+        "dropped_total": int(sum(d for _, d in stats)),
+        "latency_p50_ms": float(np.percentile(all_latencies, 50) * 1000) if len(all_latencies) else 0.0,
+        "latency_p95_ms": float(np.percentile(all_latencies, 95) * 1000) if len(all_latencies) else 0.0,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Landmark streaming server load test")
+    parser.add_argument("--address", default="127.0.0.1:0",
+                        help='"unix:/path" or "host:port" (default: 127.0.0.1 on a free port)')
+    parser.add_argument("--load-test", action="store_true", help="Run the local load test (required)")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--slow", type=int, default=5, help="How many of the clients read slowly")
+    parser.add_argument("--fps", type=float, default=60.0)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--subset", type=int, help="Publish only the first N landmarks")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.load_test:
+        print("Nothing to do: pass --load-test (the GUI serves landmarks with --serve)")
+        return 1
+    results = load_test(args.address, args.clients, args.slow, args.fps, args.seconds, args.subset)
+    for key, value in results.items():
+        print(f"{key:<20}{value:>12.2f}" if isinstance(value, float) else f"{key:<20}{value:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
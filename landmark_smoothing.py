@@ -0,0 +1,102 @@
+"""Temporal smoothing and keyframe scheduling for live landmarks.
+
+OneEuroFilter runs the One-Euro filter (Casiez et al.) element-wise over the
+whole (N, 3) landmark array at once. Between inference keyframes it predicts
+positions from the filtered velocity, so the display rate is not bounded by
+the inference rate.
+"""
+import time
+from collections import deque
+
+import numpy as np
+
+
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2.0 * np.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    def __init__(self, min_cutoff=1.0, beta=0.05, d_cutoff=1.0, max_prediction=0.2):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.max_prediction = max_prediction  # seconds a prediction may run past the last keyframe
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.velocity = None
+        self.timestamp = None
+
+    def update(self, landmarks, timestamp=None):
+        """Filter a new (N, 3) measurement and return the smoothed array."""
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        landmarks = np.asarray(landmarks, dtype=np.float32)
+        if self.value is None or self.value.shape != landmarks.shape or timestamp <= self.timestamp:
+            self.value = landmarks.copy()
+            self.velocity = np.zeros_like(landmarks)
+            self.timestamp = timestamp
+            return self.value.copy()
+
+        dt = timestamp - self.timestamp
+        raw_velocity = (landmarks - self.value) / dt
+        self.velocity += _alpha(self.d_cutoff, dt) * (raw_velocity - self.velocity)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.velocity)
+        self.value += _alpha(cutoff, dt).astype(np.float32) * (landmarks - self.value)
+        self.timestamp = timestamp
+        return self.value.copy()
+
+    def predict(self, timestamp=None):
+        """Extrapolate the filtered landmarks to `timestamp` using the filtered velocity."""
+        if self.value is None:
+            return None
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        dt = min(max(0.0, timestamp - self.timestamp), self.max_prediction)
+        return self.value + self.velocity * dt
+
+
+class KeyframeScheduler:
+    """Decides which frames run inference: every `interval`-th frame, and no faster than `max_rate` Hz."""
+
+    def __init__(self, interval=1, max_rate=0.0):
+        self.interval = max(1, interval)
+        self.max_rate = max_rate
+        self.frames_since_keyframe = None
+        self.last_keyframe_time = None
+
+    def reset(self):
+        self.frames_since_keyframe = None
+        self.last_keyframe_time = None
+
+    def is_keyframe(self, timestamp=None):
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        if self.frames_since_keyframe is None:
+            keyframe = True
+        else:
+            self.frames_since_keyframe += 1
+            keyframe = self.frames_since_keyframe >= self.interval
+            if keyframe and self.max_rate > 0:
+                keyframe = timestamp - self.last_keyframe_time >= 1.0 / self.max_rate
+        if keyframe:
+            self.frames_since_keyframe = 0
+            self.last_keyframe_time = timestamp
+        return keyframe
+
+
+class RateCounter:
+    """Events per second over a sliding window of recent timestamps."""
+
+    def __init__(self, window=60):
+        self.timestamps = deque(maxlen=window)
+
+    def reset(self):
+        self.timestamps.clear()
+
+    def tick(self, timestamp=None):
+        self.timestamps.append(time.perf_counter() if timestamp is None else timestamp)
+
+    def rate(self):
+        if len(self.timestamps) < 2 or self.timestamps[-1] <= self.timestamps[0]:
+            return 0.0
+        return (len(self.timestamps) - 1) / (self.timestamps[-1] - self.timestamps[0])
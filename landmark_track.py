@@ -0,0 +1,162 @@
+"""Precomputed, memory-mapped landmark tracks for video files.
+
+A background pass runs FaceMesh over every frame of a video once and stores the
+results in `<video>.landmarks.npy`, a (frames x 478 x 3) float32 memmap that
+sits next to the video (NaN rows = no face / not processed yet). Progress is
+recorded in `<video>.landmarks.json`, so an interrupted pass resumes where it
+stopped. Scrubbing then reads coordinates straight from the memmap.
+"""
+import json
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from landmark_overlay import NUM_LANDMARKS, landmarks_to_array
+
+
+class LandmarkTrack:
+    def __init__(self, video_path, frame_count, num_landmarks=NUM_LANDMARKS):
+        self.video_path = video_path
+        self.track_path = f"{video_path}.landmarks.npy"
+        self.progress_path = f"{video_path}.landmarks.json"
+        self.frame_count = frame_count
+        self.frames_done = 0
+        self.complete = False
+
+        stat = os.stat(video_path)
+        source_id = {"video_size": stat.st_size, "video_mtime": int(stat.st_mtime)}
+        progress = self._read_progress()
+        reusable = (progress is not None and os.path.exists(self.track_path)
+                    and progress.get("source") == source_id and progress.get("frame_count") == frame_count)
+        if reusable:
+            self.landmarks = np.load(self.track_path, mmap_mode="r+")
+            reusable = self.landmarks.shape == (frame_count, num_landmarks, 3)
+        if reusable:
+            self.frames_done = progress["frames_done"]
+            self.complete = progress.get("complete", False)
+        else:
+            self.landmarks = np.lib.format.open_memmap(self.track_path, mode="w+", dtype=np.float32,
+                                                       shape=(frame_count, num_landmarks, 3))
+            self.landmarks[:] = np.nan
+        self._source_id = source_id
+        self.save_progress()
+
+    def _read_progress(self):
+        try:
+            with open(self.progress_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save_progress(self):
+        self.landmarks.flush()
+        tmp_path = self.progress_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"source": self._source_id, "frame_count": self.frame_count,
+                       "frames_done": self.frames_done, "complete": self.complete}, f)
+        os.replace(tmp_path, self.progress_path)
+
+    def frame_landmarks(self, frame_index):
+        """Landmarks for a processed frame, or None when it has no face or was not processed yet."""
+        if frame_index >= self.frames_done:
+            return None
+        landmarks = self.landmarks[frame_index]
+        if np.isnan(landmarks[0, 0]):
+            return None
+        return landmarks
+
+
+class TrackBuilder:
+    """Fills a LandmarkTrack on a background thread, resuming from track.frames_done."""
+
+    def __init__(self, track, face_mesh_factory, flush_every=100):
+        self.track = track
+        self.face_mesh_factory = face_mesh_factory
+        self.flush_every = flush_every
+        self.error = None
+        self.frames_per_second = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def progress(self):
+        return self.track.frames_done / self.track.frame_count if self.track.frame_count else 1.0
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="track-builder", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        track = self.track
+        cap = face_mesh = None
+        try:
+            cap = cv2.VideoCapture(track.video_path)
+            if not cap.isOpened():
+                raise ValueError("Could not open video file")
+            face_mesh = self.face_mesh_factory()
+            if track.frames_done:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, track.frames_done)
+            start, start_frame = time.perf_counter(), track.frames_done
+            while not self._stop.is_set() and track.frames_done < track.frame_count:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                results = face_mesh.process(rgb_frame)
+                if results.multi_face_landmarks:
+                    landmarks = landmarks_to_array(results.multi_face_landmarks[0])
+                    track.landmarks[track.frames_done, :len(landmarks)] = landmarks
+                track.frames_done += 1
+                self.frames_per_second = (track.frames_done - start_frame) / (time.perf_counter() - start)
+                if track.frames_done % self.flush_every == 0:
+                    track.save_progress()
+            if not self._stop.is_set():
+                # CAP_PROP_FRAME_COUNT is only an estimate; frames past the last readable one stay NaN
+                track.complete = True
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            track.save_progress()
+            if face_mesh is not None:
+                face_mesh.close()
+            if cap is not None:
+                cap.release()
+
+
+class VideoFrameReader:
+    """Random-access frame reader that avoids seeking for sequential reads."""
+
+    def __init__(self, video_path):
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise ValueError("Could not open video file")
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._next_index = 0
+
+    def read_rgb(self, frame_index):
+        if frame_index != self._next_index:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        ret, frame = self.cap.read()
+        if not ret:
+            self._next_index = -1
+            return None
+        self._next_index = frame_index + 1
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def release(self):
+        self.cap.release()
@@ -1,55 +1,234 @@
 import cv2
-import mediapipe as mp
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk
 import numpy as np
 import os
+import argparse
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
 
-DEFAULT_LANDMARK_INDICES = sorted(list(set([
-    0, 1, 2, 4, 5, 6, 7, 10, 13, 14, 17, 21, 30, 33, 37, 39, 40, 46, 48, 52, 53, 54, 55, 58,
-    61, 63, 65, 66, 67, 70, 78, 80, 81, 82, 84, 91, 93, 98, 103, 105, 107, 109, 127, 132,
-    133, 136, 144, 145, 146, 148, 149, 150, 152, 153, 154, 155, 157, 158, 159, 160, 161,
-    162, 163, 168, 172, 173, 176, 181, 191, 195, 197, 234, 246, 249, 251, 260, 263, 267,
-    269, 270, 276, 278, 282, 283, 284, 285, 288, 291, 293, 295, 296, 297, 300, 308, 310,
-    311, 312, 314, 321, 323, 327, 332, 334, 336, 338, 356, 361, 362, 365, 373, 374, 375,
-    377, 378, 379, 380, 381, 382, 384, 385, 386, 387, 388, 389, 390, 397, 398, 400, 405,
-    409, 415, 454, 466
-])))
+from landmark_buffers import BufferPool, PersistentPhoto, RenderCache
+from landmark_image import ImageSource, ZoomView, to_view
+from landmark_overlay import (DEFAULT_LANDMARK_INDICES, NUM_LANDMARKS, OverlayRenderer, as_faces, faces_to_array,
+                              mesh_edges)
+from landmark_pipeline import FramePipeline, SyntheticFrameSource
+from landmark_profiler import StageProfiler
+from landmark_recording import LandmarkRecorder
+from landmark_roi import RoiTracker
+from landmark_selection import LandmarkGrid, points_in_polygon, points_in_rect
+from landmark_server import LandmarkServer
+from landmark_smoothing import KeyframeScheduler, OneEuroFilter, RateCounter
+from landmark_track import LandmarkTrack, TrackBuilder, VideoFrameReader
+
+# Reference point for the startup report; mediapipe, the slow import, is loaded in the background after this
+START_TIME = time.perf_counter()
+RESIZE_DEBOUNCE_MS = 150  # Full-quality redraw once the window has stopped resizing for this long
+PREDICTED_FRAME_S = 0.015  # Pipeline mode: redraw extrapolated landmarks at most this often between results
+
+
+class LandmarkResultCache:
+    """Small LRU cache of FaceMesh landmark arrays keyed by image content hash."""
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key_for(image):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{image.shape}{image.dtype}".encode())
+        digest.update(np.ascontiguousarray(image).data)
+        return digest.hexdigest()
+
+    def lookup(self, key):
+        """Return (found, landmarks); landmarks may be None when no face was detected."""
+        if key not in self._entries:
+            return False, None
+        self._entries.move_to_end(key)
+        return True, self._entries[key]
+
+    def put(self, key, landmarks):
+        self._entries[key] = landmarks
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
 
 
 class FaceLandmarkSelectorApp:
-    def __init__(self, root):
+    def __init__(self, root, video_source=0, roi_size=256, roi_padding=0.25, keyframe_interval=1,
+                 max_inference_rate=0.0, filter_min_cutoff=1.0, filter_beta=0.05, max_faces=1,
+                 serve_address=None, serve_selected=False):
         self.root = root
+        self.max_num_faces = max(1, max_faces)
+        self.video_source = video_source  # camera index, video path, or "synthetic"
+        self.roi_size = roi_size
+        self.roi_padding = roi_padding
         self.root.title("Face Landmark Selector - Webcam/Image")
         self.root.minsize(900, 700)  # Adjusted min height slightly
 
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+        # MediaPipe is imported and the video-mode FaceMesh built on a background thread (see load_model)
+        self.mp_face_mesh = None
+        self.face_mesh = None
+        self.image_face_mesh = None  # static_image_mode instance for still images, created on first use
+        self.model_ready = threading.Event()
+        self.model_error = None
+        self.startup_times = {}
+        self.roi_tracker = None  # Created on first use of ROI tracking mode
+        self.roi_tracking_enabled = False  # Plain attribute so inference workers never touch Tk variables
+        self.keyframe_scheduler = KeyframeScheduler(keyframe_interval, max_inference_rate)
+        self.landmark_filter = OneEuroFilter(min_cutoff=filter_min_cutoff, beta=filter_beta)
+        self.smoothing_enabled = False
+        self.inference_rate = RateCounter()
+        self.display_rate = RateCounter()
+        self.overlay_renderer = OverlayRenderer()
+        self.profiler = StageProfiler()
+        self.frame_buffers = BufferPool()  # Reused capture/convert/display buffers for the Tk thread
+        self.capture_buffer = None
+        self.persistent_photo = PersistentPhoto()
+        self.tk_image = None
+        self.render_cache = RenderCache()  # Scaled still images and their overlay layer for the current canvas size
+        self.shown_cached_image = None  # Cached render currently painted on the photo, if any
+        self.canvas_size = None  # Last size reported by <Configure>
+        self.resize_after_id = None
 
         self.display_width = 640
         self.display_height = 480
         self.using_webcam = False
         self.webcam_active = False
-        self.current_image = None
+        self.current_image = None  # Reduced decode of the loaded image, used for inference
+        self.image_source = None  # Reduced + memory-mapped full-resolution pixels of the loaded image
+        self.zoom_view = ZoomView()
+        self.pan_last = None
         self.current_frame = None
+        self.current_image_key = None
+        self.current_frame_landmarks = None  # Landmarks of current_frame, reused for redraws
+        self.result_cache = LandmarkResultCache()
         self.cap = None
-        self.selected_landmark_indices = []
-        self.current_landmarks_coords = []
+        self.video_reader = None
+        self.video_track = None
+        self.track_builder = None
+        self.video_frame_index = 0
+        self.video_frame_pending = False  # Shown frame is not covered by the track yet
+        self.last_recorded_video_frame = -1  # Video frames are only recorded while the playhead moves forward
+        self.pipeline = None
+        self.last_display_time = 0.0  # Pipeline mode: when the canvas was last redrawn
+        self.recorder = None  # Streams the selected landmark columns of every shown frame to disk
+        self.server = None  # Publishes every shown frame's landmarks to local subscribers (--serve)
+        self.serve_selected = serve_selected
+        self.selected_mask = np.zeros((self.max_num_faces, NUM_LANDMARKS), dtype=bool)  # Row 0 in shared mode
+        self.per_face_selection = False
+        self.landmark_points = np.empty((0, 2), dtype=np.int32)  # Canvas positions of the shown landmarks
+        self.landmarks_per_face = NUM_LANDMARKS  # Flat index into landmark_points = face * this + landmark
+        self.landmark_faces = 0
+        self.landmark_grid = None  # Spatial index over landmark_points, rebuilt once per frame
         self.landmark_radius = 3
         self.landmark_color = "cyan"
         self.selected_landmark_color = "red"
         self.show_tesselation = True
         self.show_contours = True
+        self.canvas_image_item = None
+        self.landmark_items = []  # Persistent oval pool, indexed like landmark_points
+        self.landmark_item_colors = []
+        self.landmark_items_visible = False
+        self.hover_index = None
+        self.hover_position = None  # Last <Motion> position over the canvas; None once the pointer leaves
+        self.drag_start = None
+        self.drag_points = []
+        self.dragging = False
+        self.selection_box_item = None
+        self.selection_lasso_item = None
 
         self.create_ui()
-        self.update_status("Ready - Select a source to begin")
+        if serve_address:
+            try:
+                self.server = LandmarkServer(serve_address)
+                print(f"Serving landmarks on {self.server.bound_address}")
+            except OSError as e:
+                print(f"Could not start landmark server on {serve_address}: {e}")
+        for button in (self.load_image_btn, self.webcam_btn, self.open_video_btn):
+            button.config(state=tk.DISABLED)
+        self.update_status("Loading face landmark model...")
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.after_idle(self.on_first_window)
+        threading.Thread(target=self.load_model, name="model-loader", daemon=True).start()
+        self.poll_model_ready()
+
+    @property
+    def selected_landmark_indices(self):
+        """Sorted list of selected landmark indices (union over faces in per-face mode)."""
+        if self.per_face_selection:
+            return np.flatnonzero(self.selected_mask.any(axis=0)).tolist()
+        return np.flatnonzero(self.selected_mask[0]).tolist()
+
+    def shown_selection(self):
+        """(faces * N,) selection flags matching landmark_points."""
+        faces, n = self.landmark_faces, self.landmarks_per_face
+        if self.per_face_selection:
+            return self.selected_mask[:faces, :n].ravel()
+        return np.tile(self.selected_mask[0, :n], faces)
+
+    def selection_row(self, face):
+        return face if self.per_face_selection else 0
+
+    def load_model(self):
+        # Runs on the loader thread: only plain attributes and the Event are touched here
+        try:
+            import mediapipe as mp
+            self.mp_face_mesh = mp.solutions.face_mesh
+            self.face_mesh = self.create_face_mesh()
+            mesh_edges()  # build the overlay edge arrays off the UI thread too
+        except Exception as e:
+            self.model_error = str(e)
+        self.startup_times["model_ready"] = time.perf_counter() - START_TIME
+        self.model_ready.set()
+
+    def poll_model_ready(self):
+        if not self.model_ready.is_set():
+            self.root.after(50, self.poll_model_ready)
+            return
+        if self.model_error:
+            self.update_status(f"Error loading face landmark model: {self.model_error}")
+            messagebox.showerror("Model Error", self.model_error)
+            return
+        for button in (self.load_image_btn, self.webcam_btn, self.open_video_btn):
+            button.config(state=tk.NORMAL)
+        if self.roi_tracking_var.get():
+            self.toggle_roi_tracking()
+        self.report_startup("model_ready")
+        self.update_status(f"Ready - Select a source to begin (model loaded in "
+                           f"{self.startup_times['model_ready']:.2f}s)")
+
+    def on_first_window(self):
+        self.startup_times["first_window"] = time.perf_counter() - START_TIME
+        self.report_startup("first_window")
+
+    def note_inference_done(self):
+        if "first_inference" not in self.startup_times:
+            self.startup_times["first_inference"] = time.perf_counter() - START_TIME
+            self.report_startup("first_inference")
+
+    def report_startup(self, event):
+        labels = {"first_window": "time to first window", "model_ready": "time to model ready",
+                  "first_inference": "time to first inference"}
+        print(f"Startup: {labels[event]} {self.startup_times[event]:.3f}s")
+
+    def get_image_face_mesh(self):
+        # Still images get their own static_image_mode instance so video tracking state never leaks in
+        if self.image_face_mesh is None:
+            self.image_face_mesh = self.create_face_mesh(static_image_mode=True)
+        return self.image_face_mesh
+
+    def create_face_mesh(self, static_image_mode=False, max_faces=None):
+        return self.mp_face_mesh.FaceMesh(
+            static_image_mode=static_image_mode,
+            max_num_faces=self.max_num_faces if max_faces is None else max_faces,
+            refine_landmarks=True,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
 
     def create_ui(self):
         main_frame = ttk.Frame(self.root, padding=10)
@@ -66,6 +245,15 @@ class FaceLandmarkSelectorApp:
         self.load_image_btn.pack(side="left", padx=5)
         self.webcam_btn = ttk.Button(source_frame, text="Start Webcam", command=self.toggle_webcam)
         self.webcam_btn.pack(side="left", padx=5)
+        self.open_video_btn = ttk.Button(source_frame, text="Open Video", command=self.open_video)
+        self.open_video_btn.pack(side="left", padx=5)
+        self.pipelined_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(source_frame, text="Threaded Pipeline", variable=self.pipelined_var).pack(side="left",
+                                                                                                  padx=5)
+        self.roi_tracking_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(source_frame, text="ROI Tracking", variable=self.roi_tracking_var,
+                        command=self.toggle_roi_tracking,
+                        state=tk.NORMAL if self.max_num_faces == 1 else tk.DISABLED).pack(side="left", padx=5)
 
         display_frame = ttk.LabelFrame(control_panel, text="Display Options", padding=5)
         display_frame.pack(side="left", padx=5, fill="x")
@@ -75,6 +263,13 @@ class FaceLandmarkSelectorApp:
         self.show_contours_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(display_frame, text="Show Contours", variable=self.show_contours_var,
                         command=self.update_display).pack(side="left", padx=5)
+        ttk.Button(display_frame, text="Fit", command=self.reset_zoom).pack(side="left", padx=5)
+        self.smoothing_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(display_frame, text="Smooth Landmarks", variable=self.smoothing_var,
+                        command=self.toggle_smoothing).pack(side="left", padx=5)
+        self.show_profiler_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(display_frame, text="Show Profiler", variable=self.show_profiler_var,
+                        command=self.toggle_profiler_panel).pack(side="left", padx=5)
 
         selection_frame = ttk.LabelFrame(control_panel, text="Selection Controls", padding=5)
         selection_frame.pack(side="left", padx=5, fill="x")
@@ -82,6 +277,12 @@ class FaceLandmarkSelectorApp:
                                                                                                        padx=5)
         ttk.Button(selection_frame, text="Clear Selection", command=self.clear_selection).pack(side="left", padx=5)
         ttk.Button(selection_frame, text="Save Selection", command=self.save_selection).pack(side="left", padx=5)
+        self.record_btn = ttk.Button(selection_frame, text="Record", command=self.toggle_recording)
+        self.record_btn.pack(side="left", padx=5)
+        self.per_face_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(selection_frame, text="Per-face Selection", variable=self.per_face_var,
+                        command=self.toggle_per_face_selection,
+                        state=tk.NORMAL if self.max_num_faces > 1 else tk.DISABLED).pack(side="left", padx=5)
 
         canvas_frame = ttk.Frame(main_frame)
         canvas_frame.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
@@ -89,7 +290,29 @@ class FaceLandmarkSelectorApp:
         main_frame.rowconfigure(1, weight=1)
         self.canvas = tk.Canvas(canvas_frame, width=self.display_width, height=self.display_height, bg="black")
         self.canvas.pack(fill="both", expand=True)
-        self.canvas.bind("<Button-1>", self.on_canvas_click)
+        self.canvas.bind("<ButtonPress-1>", self.on_canvas_press)
+        self.canvas.bind("<B1-Motion>", self.on_canvas_drag)
+        self.canvas.bind("<ButtonRelease-1>", self.on_canvas_release)
+        self.canvas.bind("<Motion>", self.on_canvas_motion)
+        self.canvas.bind("<Leave>", self.on_canvas_leave)
+        self.canvas.bind("<Configure>", self.on_canvas_configure)
+        # Still images: wheel zooms around the cursor, right-drag pans
+        self.canvas.bind("<MouseWheel>", self.on_canvas_wheel)
+        self.canvas.bind("<Button-4>", self.on_canvas_wheel)
+        self.canvas.bind("<Button-5>", self.on_canvas_wheel)
+        self.canvas.bind("<ButtonPress-3>", self.on_pan_start)
+        self.canvas.bind("<B3-Motion>", self.on_pan_drag)
+
+        # Scrub bar, only packed while a video file is open
+        self.video_controls = ttk.Frame(canvas_frame)
+        self.scrub_var = tk.IntVar(value=0)
+        self.scrub_scale = tk.Scale(self.video_controls, from_=0, to=0, orient="horizontal", showvalue=False,
+                                    variable=self.scrub_var, command=self.on_scrub)
+        self.scrub_scale.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        self.track_progress = ttk.Progressbar(self.video_controls, length=120, maximum=1.0)
+        self.track_progress.pack(side="left", padx=5)
+        self.track_progress_var = tk.StringVar()
+        ttk.Label(self.video_controls, textvariable=self.track_progress_var, width=22).pack(side="left")
 
         right_panel = ttk.Frame(main_frame)
         right_panel.grid(row=1, column=1, sticky="nsew", padx=5, pady=5)
@@ -115,9 +338,21 @@ class FaceLandmarkSelectorApp:
         self.copy_list_btn.pack(anchor="w", pady=(0, 10), fill="x")
 
         info_text = ("Click on landmarks to select/deselect them.\n"
+                     "Drag a box (Shift: lasso) to select a region,\n"
+                     "hold Ctrl while dragging to deselect it.\n"
                      "Selected landmarks will appear in red.\n")
         ttk.Label(right_panel, text=info_text, justify="left").pack(anchor="w", pady=(5, 0))
 
+        # Per-stage timing panel, only packed while "Show Profiler" is checked
+        self.profiler_panel = ttk.LabelFrame(right_panel, text="Profiler", padding=5)
+        self.profiler_text_var = tk.StringVar()
+        ttk.Label(self.profiler_panel, textvariable=self.profiler_text_var, justify="left",
+                  font="TkFixedFont").pack(anchor="w")
+        profiler_buttons = ttk.Frame(self.profiler_panel)
+        profiler_buttons.pack(fill="x", pady=(5, 0))
+        ttk.Button(profiler_buttons, text="Dump Trace", command=self.dump_profiler_trace).pack(side="left")
+        ttk.Button(profiler_buttons, text="Reset", command=self.profiler.reset).pack(side="left", padx=5)
+
         self.status_var = tk.StringVar()
         status_bar = ttk.Label(main_frame, textvariable=self.status_var, relief="sunken", anchor="w")
         status_bar.grid(row=2, column=0, columnspan=2, sticky="ew", pady=(5, 0))
@@ -129,6 +364,7 @@ class FaceLandmarkSelectorApp:
     def load_image(self):
         if self.webcam_active:
             self.stop_webcam()
+        self.close_video()
         filepath = filedialog.askopenfilename(
             title="Select an image file",
             filetypes=[
@@ -139,28 +375,42 @@ class FaceLandmarkSelectorApp:
         if not filepath: return
         try:
             self.update_status(f"Loading image: {os.path.basename(filepath)}...")
-            image = cv2.imread(filepath)
-            if image is None: raise ValueError(
-                "Failed to open image file. Check if the format is supported by OpenCV and the file is not corrupted.")
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            height, width = image_rgb.shape[:2]
-            max_dim = 800
-            if width > max_dim or height > max_dim:
-                scale = min(max_dim / width, max_dim / height)
-                new_width = int(width * scale)
-                new_height = int(height * scale)
-                image_rgb = cv2.resize(image_rgb, (new_width, new_height))
-            # self.display_width = image_rgb.shape[1] # Canvas size is now dynamic
-            # self.display_height = image_rgb.shape[0]
-            # self.canvas.config(width=self.display_width, height=self.display_height)
-            self.current_image = image_rgb
+            # Decoded at reduced size for inference; full resolution is mapped in the background for zooming
+            source = ImageSource(filepath, max_dim=800)
+            self.close_image_source()
+            self.image_source = source
+            self.render_cache.clear()
+            self.zoom_view.reset()
+            self.current_image = source.reduced
+            self.current_image_key = None
             self.current_frame = None
             self.using_webcam = False
             self.process_image()
+            if source.is_large:
+                self.poll_full_resolution(source)
         except Exception as e:
             self.update_status(f"Error loading image: {str(e)}")
             messagebox.showerror("Image Error", str(e))
 
+    def close_image_source(self):
+        if self.image_source is not None:
+            self.image_source.close()
+            self.image_source = None
+
+    def poll_full_resolution(self, source):
+        if source is not self.image_source: return
+        if not source.full_ready.is_set():
+            self.root.after(100, self.poll_full_resolution, source)
+            return
+        if source.error:
+            self.update_status(f"Full resolution unavailable: {source.error}")
+            return
+        self.update_status(f"Full resolution ready ({source.width}x{source.height}) - scroll to zoom, "
+                           f"right-drag to pan")
+        self.render_cache.clear()  # zoomed tiles were resampled from the reduced copy
+        if self.zoom_view.zoomed:
+            self.update_display()
+
     def toggle_webcam(self):
         if not self.webcam_active:
             self.start_webcam()
@@ -168,82 +418,431 @@ class FaceLandmarkSelectorApp:
             self.stop_webcam()
 
     def start_webcam(self):
+        self.close_video()
         try:
-            self.cap = cv2.VideoCapture(0)
+            self.cap = self.open_video_source()
             if not self.cap.isOpened(): raise ValueError("Could not open webcam")
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)  # Preferred webcam width
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)  # Preferred webcam height
             self.webcam_active = True
             self.using_webcam = True
             self.webcam_btn.config(text="Stop Webcam")
-            self.update_status("Webcam active")
-            self.update_webcam_frame()
+            self.keyframe_scheduler.reset()
+            self.landmark_filter.reset()
+            self.inference_rate.reset()
+            self.display_rate.reset()
+            if self.pipelined_var.get():
+                self.current_frame = None  # from here on current_frame is always a pooled pipeline frame
+                self.current_frame_landmarks = None
+                self.last_display_time = 0.0
+                self.pipeline = FramePipeline(self.cap, self.infer_frame_landmarks, profiler=self.profiler,
+                                              keyframe_scheduler=self.keyframe_scheduler)
+                self.pipeline.start()
+                self.update_status("Webcam active (threaded pipeline)")
+                self.update_pipeline_frame()
+            else:
+                self.update_status("Webcam active")
+                self.update_webcam_frame()
         except Exception as e:
             self.update_status(f"Webcam error: {str(e)}")
             messagebox.showerror("Webcam Error", str(e))
 
+    def open_video(self):
+        if self.webcam_active:
+            self.stop_webcam()
+        filepath = filedialog.askopenfilename(
+            title="Select a video file",
+            filetypes=[
+                ('Video files', '*.mp4;*.avi;*.mov;*.mkv;*.webm'),
+                ('All files', '*.*')
+            ]
+        )
+        if not filepath: return
+        self.close_video()
+        try:
+            self.video_reader = VideoFrameReader(filepath)
+            if self.video_reader.frame_count <= 0: raise ValueError("Could not determine the video frame count")
+            self.video_track = LandmarkTrack(filepath, self.video_reader.frame_count)
+            if not self.video_track.complete:
+                # The track stores one face per frame; with several faces FaceMesh's order is not stable
+                self.track_builder = TrackBuilder(self.video_track, partial(self.create_face_mesh, max_faces=1))
+                self.track_builder.start()
+        except Exception as e:
+            self.close_video()
+            self.update_status(f"Error opening video: {str(e)}")
+            messagebox.showerror("Video Error", str(e))
+            return
+        self.current_image = None
+        self.close_image_source()
+        self.using_webcam = False
+        self.scrub_scale.config(to=self.video_reader.frame_count - 1)
+        self.scrub_var.set(0)
+        self.video_controls.pack(side="bottom", fill="x", pady=(5, 0), before=self.canvas)
+        self.show_video_frame(0)
+        self.update_track_progress()
+
+    def close_video(self):
+        if self.track_builder is not None:
+            self.track_builder.stop()
+            self.track_builder = None
+        if self.video_reader is not None:
+            self.video_reader.release()
+            self.video_reader = None
+        self.video_track = None
+        self.video_controls.pack_forget()
+
+    def on_scrub(self, value):
+        if self.video_reader is not None and int(value) != self.video_frame_index:
+            self.show_video_frame(int(value))
+
+    def show_video_frame(self, frame_index):
+        frame = self.video_reader.read_rgb(frame_index)
+        if frame is None:
+            self.update_status(f"Could not read frame {frame_index}")
+            return
+        self.video_frame_index = frame_index
+        self.current_frame = frame
+        # Landmarks come from the precomputed track; scrubbing never runs inference
+        self.current_frame_landmarks = self.video_track.frame_landmarks(frame_index)
+        self.video_frame_pending = frame_index >= self.video_track.frames_done
+        self.redraw_frame()
+        if not self.video_frame_pending:
+            # Scrubbing back or re-showing a frame must not add non-monotonic or duplicate samples
+            record = frame_index > self.last_recorded_video_frame
+            self.export_frame(self.current_frame_landmarks, frame_index / self.video_reader.fps, record=record)
+            if record and self.recorder is not None:
+                self.last_recorded_video_frame = frame_index
+        if self.video_frame_pending:
+            self.status_var.set(f"Frame {frame_index} - landmarks not computed yet")
+        elif self.current_frame_landmarks is None:
+            self.status_var.set(f"Frame {frame_index} - no face detected")
+        else:
+            self.status_var.set(f"Frame {frame_index} - {self.face_count_text(self.current_frame_landmarks)}")
+
+    def update_track_progress(self):
+        if self.video_track is None: return
+        builder = self.track_builder
+        self.track_progress["value"] = self.video_track.frames_done / self.video_track.frame_count
+        if builder is not None and builder.running:
+            self.track_progress_var.set(f"Tracking {self.video_track.frames_done}/{self.video_track.frame_count} "
+                                        f"({builder.frames_per_second:.0f} fps)")
+            if self.video_frame_pending and self.video_frame_index < self.video_track.frames_done:
+                self.show_video_frame(self.video_frame_index)  # landmarks for the shown frame just arrived
+            self.root.after(250, self.update_track_progress)
+        elif builder is not None and builder.error:
+            self.track_progress_var.set("Tracking failed")
+            self.update_status(f"Error computing landmark track: {builder.error}")
+        else:
+            self.track_progress["value"] = 1.0
+            self.track_progress_var.set("Track ready")
+            if self.video_frame_pending:
+                self.show_video_frame(self.video_frame_index)
+
+    def open_video_source(self):
+        if self.video_source == "synthetic":
+            return SyntheticFrameSource()
+        return cv2.VideoCapture(self.video_source)
+
     def stop_webcam(self):
+        if self.pipeline is not None:
+            self.pipeline.stop()
+            self.pipeline = None
         if self.cap is not None:
             self.cap.release()
             self.cap = None
+        self.capture_buffer = None
         self.webcam_active = False
         self.webcam_btn.config(text="Start Webcam")
         self.update_status("Webcam stopped")
 
     def update_webcam_frame(self):
         if not self.webcam_active: return
-        ret, frame = self.cap.read()
+        with self.profiler.stage("capture"):
+            ret, frame = self.cap.read(self.capture_buffer)
         if ret:
-            frame = cv2.flip(frame, 1)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            self.capture_buffer = frame  # read() fills this array in place from now on
+            with self.profiler.stage("convert"):
+                rgb_frame = self.frame_buffers.get("rgb", frame.shape)
+                cv2.flip(frame, 1, dst=rgb_frame)
+                cv2.cvtColor(rgb_frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
             self.current_frame = rgb_frame
             self.process_frame()
+            self.profiler.frame_done()
             self.root.after(15, self.update_webcam_frame)
         else:
             self.update_status("Error: Could not read frame from webcam")
             self.stop_webcam()
 
+    def update_pipeline_frame(self):
+        if not self.webcam_active or self.pipeline is None: return
+        if self.pipeline.error:
+            self.update_status(f"Error: {self.pipeline.error}")
+            self.stop_webcam()
+            return
+        result = self.pipeline.poll()
+        now = time.perf_counter()
+        if result is not None:
+            if self.current_frame is not None and self.current_frame is not result.frame_rgb:
+                self.pipeline.release_frame(self.current_frame)
+            self.current_frame = result.frame_rgb
+            self.current_frame_landmarks = self.smooth_landmarks(result.landmarks, result.capture_time)
+            self.note_inference_done()
+            self.export_frame(self.current_frame_landmarks, result.capture_time)
+            display_start = time.perf_counter()
+            self.redraw_frame()
+            self.record_face_cost(result.landmarks, result.inference_time + time.perf_counter() - display_start)
+            self.profiler.frame_done()
+            self.inference_rate.tick(now)
+            self.display_rate.tick(now)
+            self.last_display_time = now
+            status = (f"{self.pipeline.status_text()} | inference {self.inference_rate.rate():.1f} Hz, "
+                      f"display {self.display_rate.rate():.1f} Hz")
+            if self.roi_tracking_enabled:
+                status += f" | {self.roi_tracker.status_text()}"
+            status += f" | {self.face_cost_text()}"
+            self.status_var.set(status)
+        elif (self.smoothing_enabled and self.current_frame_landmarks is not None
+              and now - self.last_display_time >= PREDICTED_FRAME_S):
+            # Between results: extrapolate the filtered landmarks so the overlay moves faster than inference
+            self.current_frame_landmarks = self.landmark_filter.predict(now)
+            self.redraw_frame()
+            self.profiler.frame_done()
+            self.display_rate.tick(now)
+            self.last_display_time = now
+        self.root.after(5, self.update_pipeline_frame)
+
+    def redraw_frame(self):
+        # Display-only path: reuses current_frame_landmarks and never re-runs inference
+        if self.current_frame_landmarks is None:
+            self.clear_landmark_points()
+            self.display_image(self.current_frame)
+        else:
+            self.display_image_with_landmarks(self.current_frame, self.current_frame_landmarks)
+
+    def image_landmarks(self):
+        """Landmarks for current_image, served from the result cache when the image was seen before."""
+        if self.current_image_key is None:
+            self.current_image_key = self.result_cache.key_for(self.current_image)
+        found, landmarks = self.result_cache.lookup(self.current_image_key)
+        if not found:
+            self.update_status("Processing face landmarks...")
+            with self.profiler.stage("inference"):
+                results = self.get_image_face_mesh().process(self.current_image)
+            self.note_inference_done()
+            landmarks = faces_to_array(results.multi_face_landmarks) if results.multi_face_landmarks else None
+            self.result_cache.put(self.current_image_key, landmarks)
+        return landmarks
+
+    def redraw_image(self):
+        if self.current_image is None: return None
+        self.clear_landmark_points()
+        landmarks = self.image_landmarks()
+        self.display_still_image(landmarks)  # Display image even if no face
+        return landmarks
+
     def process_image(self):
         if self.current_image is None: return
-        self.current_landmarks_coords = []
-        self.update_status("Processing face landmarks...")
         try:
-            results = self.face_mesh.process(self.current_image)
-            if not results.multi_face_landmarks:
+            landmarks = self.redraw_image()
+            if landmarks is None:
                 self.update_status("No face detected in the image")
-                self.display_image(self.current_image)  # Display image even if no face
                 return
-            self.display_image_with_landmarks(self.current_image, results.multi_face_landmarks[0])
-            landmark_count = len(results.multi_face_landmarks[0].landmark)
-            self.update_status(f"Image loaded - {landmark_count} landmarks detected")
+            self.update_status(f"Image loaded - {self.face_count_text(landmarks)} detected")
         except Exception as e:
             self.update_status(f"Error processing image: {str(e)}")
 
+    def toggle_roi_tracking(self):
+        if not self.model_ready.is_set() or self.model_error:
+            return  # picked up by poll_model_ready once the model is loaded
+        if self.roi_tracking_var.get() and self.roi_tracker is None:
+            self.roi_tracker = RoiTracker(self.face_mesh, self.create_face_mesh(),
+                                          target_size=self.roi_size, padding=self.roi_padding)
+        elif self.roi_tracker is not None:
+            self.roi_tracker.reset()
+        self.roi_tracking_enabled = self.roi_tracking_var.get()
+
+    def infer_frame_landmarks(self, rgb_frame):
+        """(faces, N, 3) landmarks for a live frame: ROI tracking when enabled, otherwise full-frame mode."""
+        if self.roi_tracking_enabled:
+            landmarks = self.roi_tracker.process(rgb_frame)
+            return None if landmarks is None else landmarks[None]
+        results = self.face_mesh.process(rgb_frame)
+        if not results.multi_face_landmarks:
+            return None
+        return faces_to_array(results.multi_face_landmarks)
+
+    def face_count_text(self, landmarks):
+        faces = as_faces(landmarks)
+        return f"{len(faces)} face(s), {faces.shape[1]} landmarks each"
+
+    def record_face_cost(self, landmarks, seconds):
+        """Per-frame cost (inference + display) bucketed by the number of faces in the frame."""
+        faces = 0 if landmarks is None else len(as_faces(landmarks))
+        self.profiler.record(f"frame@{faces}faces", seconds)
+
+    def face_cost_text(self):
+        stats = self.profiler.summary()["stages"]
+        parts = []
+        for faces in range(self.max_num_faces + 1):
+            cost = stats.get(f"frame@{faces}faces")
+            if cost is not None and cost["p50"] > 0:
+                parts.append(f"{faces}f {cost['p50']:.0f} ms (~{1000.0 / cost['p50']:.0f} fps)")
+        return "cost " + ", ".join(parts) if parts else "cost -"
+
+    def toggle_smoothing(self):
+        self.landmark_filter.reset()
+        self.smoothing_enabled = self.smoothing_var.get()
+
+    def smooth_landmarks(self, landmarks, timestamp):
+        if landmarks is None:
+            self.landmark_filter.reset()
+            return None
+        if not self.smoothing_enabled:
+            return landmarks
+        return self.landmark_filter.update(landmarks, timestamp)
+
     def process_frame(self):
         if self.current_frame is None: return
-        self.current_landmarks_coords = []
+        self.clear_landmark_points()
         try:
-            results = self.face_mesh.process(self.current_frame)
-            if not results.multi_face_landmarks:
+            now = frame_start = time.perf_counter()
+            if self.keyframe_scheduler.is_keyframe(now):
+                with self.profiler.stage("inference"):
+                    landmarks = self.infer_frame_landmarks(self.current_frame)
+                self.note_inference_done()
+                self.inference_rate.tick(now)
+                self.current_frame_landmarks = self.smooth_landmarks(landmarks, now)
+            elif self.smoothing_enabled and self.current_frame_landmarks is not None:
+                # Between keyframes: extrapolate the filtered landmarks instead of re-running FaceMesh
+                self.current_frame_landmarks = self.landmark_filter.predict(now)
+            self.display_rate.tick(now)
+            self.export_frame(self.current_frame_landmarks, now)
+            if self.current_frame_landmarks is None:
                 self.display_image(self.current_frame)  # Display frame even if no face
+                self.record_face_cost(None, time.perf_counter() - frame_start)
                 self.update_status("No face detected in webcam view")
                 return
-            self.display_image_with_landmarks(self.current_frame, results.multi_face_landmarks[0])
+            self.display_image_with_landmarks(self.current_frame, self.current_frame_landmarks)
+            self.record_face_cost(self.current_frame_landmarks, time.perf_counter() - frame_start)
+            self.status_var.set(f"Webcam active - inference {self.inference_rate.rate():.1f} Hz, "
+                                f"display {self.display_rate.rate():.1f} Hz | {self.face_cost_text()}")
         except Exception as e:
             self.update_status(f"Error processing frame: {str(e)}")
 
+    def show_canvas_image(self, img_rgb, x, y):
+        # A single long-lived image item and PhotoImage are reused; the photo is repainted with paste()
+        self.shown_cached_image = None
+        with self.profiler.stage("photo"):
+            photo = self.persistent_photo.update(img_rgb)
+        with self.profiler.stage("canvas"):
+            if self.canvas_image_item is None:
+                self.canvas_image_item = self.canvas.create_image(x, y, image=photo, anchor=tk.NW)
+                self.canvas.tag_lower(self.canvas_image_item)
+            else:
+                if photo is not self.tk_image:
+                    self.canvas.itemconfig(self.canvas_image_item, image=photo)
+                self.canvas.coords(self.canvas_image_item, x, y)
+            self.tk_image = photo
+
+    def show_cached_image(self, img_rgb, x, y):
+        # Cached renders are never modified, so if this one is already on the photo only move it
+        if img_rgb is self.shown_cached_image and self.persistent_photo.size == (img_rgb.shape[1], img_rgb.shape[0]):
+            self.canvas.coords(self.canvas_image_item, x, y)
+            return
+        self.show_canvas_image(img_rgb, x, y)
+        self.shown_cached_image = img_rgb
+
+    def canvas_dimensions(self):
+        if self.canvas_size is not None:
+            return self.canvas_size
+        return self.canvas.winfo_width(), self.canvas.winfo_height()
+
+    def on_canvas_configure(self, event):
+        size = (event.width, event.height)
+        if size == self.canvas_size: return
+        previous, self.canvas_size = self.canvas_size, size
+        if previous is not None:
+            self.recenter_canvas_items(previous, size)
+        # Debounced: while the window edge is dragged only the final size gets a full redraw
+        if self.resize_after_id is not None:
+            self.root.after_cancel(self.resize_after_id)
+        self.resize_after_id = self.root.after(RESIZE_DEBOUNCE_MS, self.on_resize_settled)
+
+    def recenter_canvas_items(self, previous, size):
+        # Cheap stand-in during a resize drag: keep the current render centered, without rescaling it
+        if self.canvas_image_item is None: return
+        dx = (size[0] - previous[0]) // 2
+        dy = (size[1] - previous[1]) // 2
+        if not (dx or dy): return
+        self.canvas.move(self.canvas_image_item, dx, dy)
+        self.canvas.move("landmark", dx, dy)
+        if len(self.landmark_points):
+            self.landmark_points = self.landmark_points + (dx, dy)
+            self.landmark_grid = LandmarkGrid(self.landmark_points, cell_size=max(16, self.landmark_radius * 3))
+
+    def on_resize_settled(self):
+        self.resize_after_id = None
+        if self.using_webcam and self.webcam_active: return  # the next live frame is drawn at the new size
+        self.update_display()
+
+    def hide_landmark_items(self):
+        if self.landmark_items_visible:
+            self.canvas.itemconfig("landmark", state=tk.HIDDEN)
+            self.landmark_items_visible = False
+
+    def clear_landmark_points(self):
+        # hover_index is kept: update_landmark_items hit-tests hover_position again once the new points are placed
+        self.landmark_points = np.empty((0, 2), dtype=np.int32)
+        self.landmark_grid = None
+
+    def update_landmark_items(self):
+        # Grow the oval pool only when more landmarks are needed than ever before
+        r = self.landmark_radius
+        num_visible = len(self.landmark_points)
+        while len(self.landmark_items) < num_visible:
+            idx = len(self.landmark_items)
+            item = self.canvas.create_oval(0, 0, 0, 0, fill=self.landmark_color, outline=self.landmark_color,
+                                           tags=("landmark", f"lm_{idx}"))
+            self.landmark_items.append(item)
+            self.landmark_item_colors.append(self.landmark_color)
+
+        selected = self.shown_selection().tolist()
+        for idx, (x, y) in enumerate(self.landmark_points.tolist()):
+            item = self.landmark_items[idx]
+            self.canvas.coords(item, x - r, y - r, x + r, y + r)
+            color = self.selected_landmark_color if selected[idx] else self.landmark_color
+            if self.landmark_item_colors[idx] != color:  # recolor only on selection changes
+                self.canvas.itemconfig(item, fill=color, outline=color)
+                self.landmark_item_colors[idx] = color
+
+        if not self.landmark_items_visible or num_visible < len(self.landmark_items):
+            for idx, item in enumerate(self.landmark_items):
+                self.canvas.itemconfig(item, state=tk.NORMAL if idx < num_visible else tk.HIDDEN)
+        self.landmark_items_visible = num_visible > 0
+        if self.hover_position is not None:
+            # Hit-test the still cursor again: on live frames the landmarks move under it
+            self.set_hover(self.landmark_grid.nearest(*self.hover_position, self.landmark_radius * 3), force=True)
+
+    def set_hover(self, idx, force=False):
+        # At most two itemconfig calls per <Motion> event: restore the old item, outline the new one
+        if idx == self.hover_index and not force:
+            return
+        old = self.hover_index
+        if old is not None and old != idx and old < len(self.landmark_items):
+            self.canvas.itemconfig(self.landmark_items[old], outline=self.landmark_item_colors[old], width=1)
+        if idx is not None and idx < len(self.landmark_items):
+            self.canvas.itemconfig(self.landmark_items[idx], outline="white", width=2)
+        self.hover_index = idx
+
     def display_image(self, img_rgb_original):
-        self.canvas.delete("all")
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
+        self.hide_landmark_items()
+        canvas_width, canvas_height = self.canvas_dimensions()
         original_h, original_w = img_rgb_original.shape[:2]
 
         if original_w == 0 or original_h == 0 or canvas_width <= 1 or canvas_height <= 1:
             # Fallback if canvas size is not yet determined or image is empty
             # Directly use original image if canvas is tiny (e.g. during init)
-            pil_img_to_show = Image.fromarray(img_rgb_original)
-            self.tk_image = ImageTk.PhotoImage(image=pil_img_to_show)
-            self.canvas.create_image(0, 0, image=self.tk_image, anchor=tk.NW)
+            self.show_canvas_image(img_rgb_original, 0, 0)
             return
 
         scale = min(canvas_width / original_w, canvas_height / original_h)
@@ -251,26 +850,23 @@ class FaceLandmarkSelectorApp:
         display_h = int(original_h * scale)
 
         if display_w > 0 and display_h > 0:
-            display_img_resized = cv2.resize(img_rgb_original, (display_w, display_h))
+            with self.profiler.stage("resize"):
+                display_img_resized = cv2.resize(img_rgb_original, (display_w, display_h),
+                                                 dst=self.frame_buffers.get("display", (display_h, display_w, 3)))
         else:  # Should not happen if initial checks pass
             display_img_resized = img_rgb_original
 
-        pil_img = Image.fromarray(display_img_resized)
-        self.tk_image = ImageTk.PhotoImage(image=pil_img)
         offset_x = (canvas_width - display_w) // 2
         offset_y = (canvas_height - display_h) // 2
-        self.canvas.create_image(offset_x, offset_y, image=self.tk_image, anchor=tk.NW)
+        self.show_canvas_image(display_img_resized, offset_x, offset_y)
 
     def display_image_with_landmarks(self, img_rgb_original, face_landmarks):
-        self.canvas.delete("all")
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
+        canvas_width, canvas_height = self.canvas_dimensions()
         original_h, original_w = img_rgb_original.shape[:2]
 
         if original_w == 0 or original_h == 0 or canvas_width <= 1 or canvas_height <= 1:
-            pil_img_to_show = Image.fromarray(img_rgb_original)  # Basic display
-            self.tk_image = ImageTk.PhotoImage(image=pil_img_to_show)
-            self.canvas.create_image(0, 0, image=self.tk_image, anchor=tk.NW)
+            self.hide_landmark_items()
+            self.show_canvas_image(img_rgb_original, 0, 0)  # Basic display
             return
 
         scale = min(canvas_width / original_w, canvas_height / original_h)
@@ -280,57 +876,107 @@ class FaceLandmarkSelectorApp:
         if not (display_w > 0 and display_h > 0):  # safety check
             display_w, display_h = original_w, original_h  # use original if scale is bad
 
-        display_img_resized = cv2.resize(img_rgb_original, (display_w, display_h))
-        draw_img = display_img_resized.copy()
+        with self.profiler.stage("resize"):
+            display_img_resized = cv2.resize(img_rgb_original, (display_w, display_h),
+                                             dst=self.frame_buffers.get("display", (display_h, display_w, 3)))
         offset_x = (canvas_width - display_w) // 2
         offset_y = (canvas_height - display_h) // 2
 
-        if self.show_tesselation_var.get():
-            overlay = draw_img.copy()
-            for connection in self.mp_face_mesh.FACEMESH_TESSELATION:
-                start_idx, end_idx = connection
-                if start_idx < len(face_landmarks.landmark) and end_idx < len(face_landmarks.landmark):
-                    start_pt = face_landmarks.landmark[start_idx]
-                    end_pt = face_landmarks.landmark[end_idx]
-                    cv2.line(overlay, (int(start_pt.x * display_w), int(start_pt.y * display_h)),
-                             (int(end_pt.x * display_w), int(end_pt.y * display_h)), (0, 255, 255), 1)
-            alpha = 0.4
-            cv2.addWeighted(overlay, alpha, draw_img, 1 - alpha, 0, draw_img)
-
-        if self.show_contours_var.get():
-            for connection in self.mp_face_mesh.FACEMESH_CONTOURS:
-                start_idx, end_idx = connection
-                if start_idx < len(face_landmarks.landmark) and end_idx < len(face_landmarks.landmark):
-                    start_pt = face_landmarks.landmark[start_idx]
-                    end_pt = face_landmarks.landmark[end_idx]
-                    cv2.line(draw_img, (int(start_pt.x * display_w), int(start_pt.y * display_h)),
-                             (int(end_pt.x * display_w), int(end_pt.y * display_h)), (0, 255, 0), 2)
-
-        pil_img = Image.fromarray(draw_img)
-        self.tk_image = ImageTk.PhotoImage(image=pil_img)
-        self.canvas.create_image(offset_x, offset_y, image=self.tk_image, anchor=tk.NW)
-
-        self.current_landmarks_coords = []
-        for idx, landmark in enumerate(face_landmarks.landmark):
-            x_on_scaled_img = int(landmark.x * display_w)
-            y_on_scaled_img = int(landmark.y * display_h)
-            x_on_canvas = x_on_scaled_img + offset_x
-            y_on_canvas = y_on_scaled_img + offset_y
-            self.current_landmarks_coords.append((x_on_canvas, y_on_canvas, idx))
-            color = self.selected_landmark_color if idx in self.selected_landmark_indices else self.landmark_color
-            self.canvas.create_oval(
-                x_on_canvas - self.landmark_radius, y_on_canvas - self.landmark_radius,
-                x_on_canvas + self.landmark_radius, y_on_canvas + self.landmark_radius,
-                fill=color, outline=color, tags=f"lm_{idx}"
-            )
+        self.show_with_landmarks(display_img_resized, offset_x, offset_y, as_faces(face_landmarks))
+
+    def display_still_image(self, landmarks):
+        """Draw the loaded image through the zoom view, resampling only the visible tile.
+
+        The scaled tile and its overlay layer come from the render cache, so selection changes and
+        repeated redraws at the same size and view only repaint the photo and the ovals.
+        """
+        canvas_width, canvas_height = self.canvas_dimensions()
+        if self.image_source is None or canvas_width <= 1 or canvas_height <= 1:
+            if landmarks is None:
+                self.display_image(self.current_image)
+            else:
+                self.display_image_with_landmarks(self.current_image, landmarks)
+            return
+        self.render_cache.set_canvas_size((canvas_width, canvas_height))
+        view_key = (self.current_image_key, self.zoom_view.zoom, self.zoom_view.center)
+        with self.profiler.stage("resize"):
+            # No pooled buffer here: cached tiles must not be overwritten by the next render
+            tile, (offset_x, offset_y), rect = self.render_cache.get(
+                ("base",) + view_key,
+                lambda: self.image_source.render(self.zoom_view, canvas_width, canvas_height))
+        if landmarks is None:
+            self.hide_landmark_items()
+            self.show_cached_image(tile, offset_x, offset_y)
+            return
+        # Landmarks are normalized to the whole image; re-normalize them to the tile's exact extent
+        faces = to_view(as_faces(landmarks), rect)
+        options = self.update_overlay_options()
+        with self.profiler.stage("overlay"):
+            layer = self.render_cache.get(("overlay",) + view_key + options,
+                                          lambda: self.overlay_renderer.render(tile, faces, out=np.empty_like(tile)))
+        self.show_cached_image(layer, offset_x, offset_y)
+        self.place_landmark_items(faces, tile.shape[1], tile.shape[0], offset_x, offset_y)
+
+    def update_overlay_options(self):
+        options = self.overlay_renderer.options
+        options.show_tesselation = self.show_tesselation_var.get()
+        options.show_contours = self.show_contours_var.get()
+        return options.show_tesselation, options.show_contours
+
+    def show_with_landmarks(self, display_img, offset_x, offset_y, faces):
+        """Overlay `faces` (normalized to display_img) on display_img in place and place the landmark ovals."""
+        display_h, display_w = display_img.shape[:2]
+        self.update_overlay_options()
+        with self.profiler.stage("overlay"):
+            # Drawn in place: display_img is a scratch buffer rebuilt on every redraw
+            draw_img = self.overlay_renderer.render(display_img, faces, out=display_img)
+        self.show_canvas_image(draw_img, offset_x, offset_y)
+        self.place_landmark_items(faces, display_w, display_h, offset_x, offset_y)
+
+    def place_landmark_items(self, faces, display_w, display_h, offset_x, offset_y):
+        with self.profiler.stage("canvas"):
+            self.landmark_faces, self.landmarks_per_face = faces.shape[:2]
+            self.landmark_points = ((faces[..., :2].reshape(-1, 2) * (display_w, display_h)).astype(np.int32)
+                                    + (offset_x, offset_y))
+            self.landmark_grid = LandmarkGrid(self.landmark_points, cell_size=max(16, self.landmark_radius * 3))
+            self.update_landmark_items()
+
+    def toggle_profiler_panel(self):
+        if self.show_profiler_var.get():
+            self.profiler_panel.pack(fill="x", pady=(10, 0))
+            self.update_profiler_panel()
+        else:
+            self.profiler_panel.pack_forget()
+
+    def update_profiler_panel(self):
+        if not self.show_profiler_var.get(): return
+        self.profiler_text_var.set(self.profiler.format_summary())
+        self.root.after(500, self.update_profiler_panel)
+
+    def dump_profiler_trace(self):
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON trace", "*.json"), ("CSV trace", "*.csv"), ("All files", "*.*")],
+            title="Save Profiler Trace"
+        )
+        if not filepath: return
+        try:
+            self.profiler.dump(filepath)
+            self.update_status(f"Saved profiler trace to {os.path.basename(filepath)}")
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Error saving trace: {str(e)}")
 
     def update_display(self):
+        # Redraw only: landmarks come from the last inference or the result cache
         if self.using_webcam and self.webcam_active:
-            if self.current_frame is not None: self.process_frame()
+            if self.current_frame is not None: self.redraw_frame()
         elif self.current_image is not None:
-            self.process_image()
+            try:
+                self.redraw_image()
+            except Exception as e:
+                self.update_status(f"Error processing image: {str(e)}")
         elif self.current_frame is not None:  # Last webcam frame after stopping
-            self.process_frame()
+            self.redraw_frame()
         else:  # No image or frame, but selection might have changed (e.g. Select Default)
             # If canvas is empty, we can't draw points. But list updates.
             # To reflect point color changes on an empty canvas (if we drew them before face detection)
@@ -339,50 +985,149 @@ class FaceLandmarkSelectorApp:
             pass
 
     def on_canvas_click(self, event):
-        if not self.current_landmarks_coords: return
-        click_x, click_y = event.x, event.y
-        closest_idx = None
-        min_dist_sq = (self.landmark_radius * 3) ** 2
+        if self.landmark_grid is None: return
+        closest_idx = self.landmark_grid.nearest(event.x, event.y, self.landmark_radius * 3)
+        if closest_idx is not None:
+            face, idx = divmod(closest_idx, self.landmarks_per_face)
+            row = self.selection_row(face)
+            self.selected_mask[row, idx] = not self.selected_mask[row, idx]
+            self.update_selection_display()
+            self.update_display()
 
-        for lm_x, lm_y, lm_idx in self.current_landmarks_coords:
-            dist_sq = (lm_x - click_x) ** 2 + (lm_y - click_y) ** 2
-            if dist_sq < min_dist_sq:
-                min_dist_sq = dist_sq
-                closest_idx = lm_idx
+    def on_canvas_press(self, event):
+        self.drag_start = (event.x, event.y)
+        self.drag_points = [(event.x, event.y)]
+        self.dragging = False
 
-        if closest_idx is not None:
-            if closest_idx in self.selected_landmark_indices:
-                self.selected_landmark_indices.remove(closest_idx)
-            else:
-                self.selected_landmark_indices.append(closest_idx)
-            # self.selected_landmark_indices.sort() # Sorting handled in update_selection_display
-            self.update_selection_display()  # This will sort and update text area
+    def on_canvas_drag(self, event):
+        if self.drag_start is None: return
+        x0, y0 = self.drag_start
+        if not self.dragging:
+            if abs(event.x - x0) + abs(event.y - y0) < 5:
+                return  # still a click
+            self.dragging = True
+        lasso = bool(event.state & 0x0001)  # Shift
+        if lasso:
+            self.drag_points.append((event.x, event.y))
+            if self.selection_lasso_item is None:
+                self.selection_lasso_item = self.canvas.create_line(0, 0, 0, 0, fill="yellow", dash=(4, 2))
+            points = self.drag_points + [self.drag_points[0]]
+            self.canvas.coords(self.selection_lasso_item, *[v for p in points for v in p])
+            self.canvas.itemconfig(self.selection_lasso_item, state=tk.NORMAL)
+            self.canvas.tag_raise(self.selection_lasso_item)
+        else:
+            self.drag_points = [self.drag_start, (event.x, event.y)]
+            if self.selection_box_item is None:
+                self.selection_box_item = self.canvas.create_rectangle(0, 0, 0, 0, outline="yellow", dash=(4, 2))
+            self.canvas.coords(self.selection_box_item, x0, y0, event.x, event.y)
+            self.canvas.itemconfig(self.selection_box_item, state=tk.NORMAL)
+            self.canvas.tag_raise(self.selection_box_item)
+
+    def on_canvas_release(self, event):
+        if not self.dragging:
+            self.drag_start = None
+            self.on_canvas_click(event)
+            return
+        for item in (self.selection_box_item, self.selection_lasso_item):
+            if item is not None:
+                self.canvas.itemconfig(item, state=tk.HIDDEN)
+        lasso = len(self.drag_points) > 2
+        self.select_region(self.drag_points, lasso=lasso, deselect=bool(event.state & 0x0004))  # Ctrl
+        self.drag_start = None
+        self.drag_points = []
+        self.dragging = False
+
+    def select_region(self, points, lasso=False, deselect=False):
+        """Add (or remove) every shown landmark inside a box or lasso polygon, tested in one vectorized pass."""
+        if not len(self.landmark_points): return
+        if lasso:
+            inside = points_in_polygon(self.landmark_points, points)
+        else:
+            (x0, y0), (x1, y1) = points[0], points[-1]
+            inside = points_in_rect(self.landmark_points, x0, y0, x1, y1)
+        inside = inside.reshape(self.landmark_faces, self.landmarks_per_face)
+        if self.per_face_selection:
+            self.selected_mask[:self.landmark_faces, :self.landmarks_per_face][inside] = not deselect
+        else:  # shared: a landmark picked on any face applies to all of them
+            self.selected_mask[0, :self.landmarks_per_face][inside.any(axis=0)] = not deselect
+        self.update_selection_display()
+        self.update_display()
+
+    def on_canvas_motion(self, event):
+        self.hover_position = (event.x, event.y)
+        if self.landmark_grid is None:
+            return
+        self.set_hover(self.landmark_grid.nearest(event.x, event.y, self.landmark_radius * 3))
+
+    def on_canvas_leave(self, event):
+        self.hover_position = None
+        self.set_hover(None)
+
+    def zoomable(self):
+        return self.image_source is not None and self.current_image is not None and not self.webcam_active
+
+    def view_size(self):
+        return self.canvas_dimensions() + (self.image_source.width, self.image_source.height)
+
+    def on_canvas_wheel(self, event):
+        if not self.zoomable(): return
+        zoom_in = event.num == 4 or getattr(event, "delta", 0) > 0
+        self.zoom_view.zoom_at(1.25 if zoom_in else 0.8, event.x, event.y, *self.view_size())
+        self.update_display()
+
+    def on_pan_start(self, event):
+        self.pan_last = (event.x, event.y)
+
+    def on_pan_drag(self, event):
+        if not self.zoomable() or self.pan_last is None: return
+        dx, dy = event.x - self.pan_last[0], event.y - self.pan_last[1]
+        self.pan_last = (event.x, event.y)
+        self.zoom_view.pan(dx, dy, *self.view_size())
+        self.update_display()
+
+    def reset_zoom(self):
+        self.zoom_view.reset()
+        if self.zoomable():
             self.update_display()
 
     def update_selection_display(self):
         self.landmark_listbox.delete(0, tk.END)
-        # Sort indices for consistent display in both listbox and text area
-        self.selected_landmark_indices.sort()
-        for idx in self.selected_landmark_indices:
-            self.landmark_listbox.insert(tk.END, f"Landmark {idx}")
+        selected = self.selected_landmark_indices  # Always sorted
+        if self.per_face_selection:
+            faces, indices = np.nonzero(self.selected_mask)
+            self.landmark_listbox.insert(tk.END, *[f"Face {face}: Landmark {idx}"
+                                                   for face, idx in zip(faces.tolist(), indices.tolist())])
+        else:
+            self.landmark_listbox.insert(tk.END, *[f"Landmark {idx}" for idx in selected])
 
-        list_str = str(self.selected_landmark_indices)
+        list_str = str(selected)
         self.selected_indices_text.config(state=tk.NORMAL)
         self.selected_indices_text.delete(1.0, tk.END)
         self.selected_indices_text.insert(tk.END, list_str)
         self.selected_indices_text.config(state=tk.DISABLED)
 
-        count = len(self.selected_landmark_indices)
+        count = len(selected)
         self.update_status(f"Selected {count} landmarks" if count > 0 else "No landmarks selected")
 
     def select_default_landmarks(self):
-        self.selected_landmark_indices = list(set(DEFAULT_LANDMARK_INDICES))  # Already sorted
+        self.selected_mask[:] = False
+        self.selected_mask[:, DEFAULT_LANDMARK_INDICES] = True
         self.update_selection_display()
-        self.update_status(f"Selected {len(self.selected_landmark_indices)} default landmarks.")
+        self.update_status(f"Selected {len(DEFAULT_LANDMARK_INDICES)} default landmarks.")
         self.update_display()
 
     def clear_selection(self):
-        self.selected_landmark_indices = []
+        self.selected_mask[:] = False
+        self.update_selection_display()
+        self.update_display()
+
+    def toggle_per_face_selection(self):
+        # Carry the selection over: shared -> every face starts from row 0, per-face -> union of all faces
+        if self.per_face_var.get():
+            self.selected_mask[1:] = self.selected_mask[0]
+        else:
+            self.selected_mask[0] = self.selected_mask.any(axis=0)
+        self.per_face_selection = self.per_face_var.get()
         self.update_selection_display()
         self.update_display()
 
@@ -425,18 +1170,101 @@ class FaceLandmarkSelectorApp:
         except Exception as e:
             messagebox.showerror("Save Error", f"Error saving file: {str(e)}")
 
+    def toggle_recording(self):
+        if self.recorder is not None:
+            self.stop_recording()
+            return
+        indices = self.selected_landmark_indices
+        if not indices:
+            messagebox.showinfo("Nothing to Record", "Select the landmarks to record first")
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".lmrec",
+            filetypes=[("Landmark recordings", "*.lmrec"), ("All files", "*.*")],
+            title="Record Selected Landmarks To"
+        )
+        if not path: return
+        try:
+            self.recorder = LandmarkRecorder(path, indices, max_faces=self.max_num_faces)
+            self.last_recorded_video_frame = -1
+        except Exception as e:
+            messagebox.showerror("Record Error", f"Error starting recording: {str(e)}")
+            return
+        self.record_btn.config(text="Stop Recording")
+        self.update_status(f"Recording {len(indices)} landmarks to {os.path.basename(path)}")
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        recorder.close()
+        self.record_btn.config(text="Record")
+        if recorder.error:
+            self.update_status(f"Recording failed: {recorder.error}")
+        else:
+            self.update_status(f"Recorded {recorder.frames_written} frames to {os.path.basename(recorder.path)}")
+
+    def export_frame(self, landmarks, timestamp, record=True):
+        # Only gathers/encodes here; disk and socket I/O run on the recorder and server threads
+        if self.recorder is not None and record:
+            self.recorder.append(landmarks, timestamp)
+        if self.server is not None:
+            self.server.publish(landmarks, indices=self.selected_landmark_indices if self.serve_selected else None)
+
     def on_closing(self):
         if self.webcam_active:
             self.stop_webcam()
+        self.close_video()
+        if self.recorder is not None:
+            self.stop_recording()
+        if self.server is not None:
+            self.server.close()
+        self.close_image_source()
         if self.face_mesh:
             self.face_mesh.close()
+        if self.image_face_mesh is not None:
+            self.image_face_mesh.close()
+        if self.roi_tracker is not None:
+            self.roi_tracker.roi_face_mesh.close()
         self.root.destroy()
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Interactive MediaPipe face landmark selector")
+    parser.add_argument("--source", default="0",
+                        help='Webcam index, video file path, or "synthetic" for a generated test feed (default: 0)')
+    parser.add_argument("--roi-size", type=int, default=256,
+                        help="ROI tracking mode: longest side of the face crop sent to FaceMesh (default: 256)")
+    parser.add_argument("--roi-padding", type=float, default=0.25,
+                        help="ROI tracking mode: padding around the last face box, as a fraction (default: 0.25)")
+    parser.add_argument("--keyframe-interval", type=int, default=1,
+                        help="Run FaceMesh on every Nth webcam frame; other frames reuse or predict landmarks")
+    parser.add_argument("--max-inference-rate", type=float, default=0.0,
+                        help="Upper bound on FaceMesh runs per second in webcam mode (0 = unlimited)")
+    parser.add_argument("--filter-min-cutoff", type=float, default=1.0,
+                        help="One-Euro filter minimum cutoff in Hz; lower values remove more jitter")
+    parser.add_argument("--filter-beta", type=float, default=0.05,
+                        help="One-Euro filter speed coefficient; higher values reduce lag on fast motion")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help='Publish live landmarks to local subscribers on "unix:/path" or "host:port"')
+    parser.add_argument("--serve-selected", action="store_true",
+                        help="With --serve, publish only the selected landmarks instead of all 478")
+    parser.add_argument("--max-faces", type=int, default=1,
+                        help="Maximum number of faces FaceMesh tracks; ROI tracking is single-face only (default: 1)")
+    args = parser.parse_args(argv)
+    if args.source.isdigit():
+        args.source = int(args.source)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
     try:
         root = tk.Tk()
-        app = FaceLandmarkSelectorApp(root)
+        app = FaceLandmarkSelectorApp(root, video_source=args.source, roi_size=args.roi_size,
+                                      roi_padding=args.roi_padding, keyframe_interval=args.keyframe_interval,
+                                      max_inference_rate=args.max_inference_rate,
+                                      filter_min_cutoff=args.filter_min_cutoff, filter_beta=args.filter_beta,
+                                      max_faces=args.max_faces, serve_address=args.serve,
+                                      serve_selected=args.serve_selected)
         # Let Tkinter determine initial size based on content, then user can resize
         # root.update_idletasks()
         # window_width = root.winfo_reqwidth()
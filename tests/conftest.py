@@ -0,0 +1,41 @@
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+# The landmark_* modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_landmarks(faces=1, count=478, seed=0):
+    """Random (faces, count, 3) float32 landmarks in normalized coordinates."""
+    return np.random.default_rng(seed).uniform(0, 1, size=(faces, count, 3)).astype(np.float32)
+
+
+def wait_until(predicate, timeout=5.0):
+    """Poll `predicate` until it is true; False if `timeout` seconds pass first."""
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+class StubFaceMesh:
+    """FaceMesh stand-in: process() reports `respond(image)` as the only face, or no face for None."""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.shapes = []  # shape of every image passed to process()
+        self.closed = False
+
+    def process(self, image):
+        self.shapes.append(image.shape)
+        landmarks = self.respond(image)
+        return SimpleNamespace(multi_face_landmarks=None if landmarks is None else [np.array(landmarks)])
+
+    def close(self):
+        self.closed = True
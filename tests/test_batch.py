@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+import landmark_batch
+from landmark_batch import find_images, load_selection, main
+
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb"):
+        pass
+
+
+def test_find_images_walks_directories_and_file_lists(tmp_path):
+    for name in ("a.jpg", "sub/b.PNG", "sub/deeper/c.tif", "notes.txt", "sub/d.gif"):
+        touch(str(tmp_path / "photos" / name))
+    extra = str(tmp_path / "extra.jpeg")
+    touch(extra)
+    file_list = tmp_path / "list.txt"
+    file_list.write_text(f"# images\n\n  {extra}  \n")
+
+    found = find_images([str(tmp_path / "photos")], [str(file_list)])
+    names = [os.path.relpath(path, tmp_path) for path in found]
+    assert names == sorted(["extra.jpeg", os.path.join("photos", "a.jpg"), os.path.join("photos", "sub", "b.PNG"),
+                            os.path.join("photos", "sub", "deeper", "c.tif")])
+    # Explicit files are kept whatever their extension; missing ones show up as unreadable later
+    assert find_images([str(tmp_path / "photos" / "notes.txt")]) == [str(tmp_path / "photos" / "notes.txt")]
+
+
+def test_load_selection_reads_the_gui_format(tmp_path):
+    path = tmp_path / "selection.txt"
+    path.write_text("33\n1\n263\n1\n\n# Comma-separated format:\n1, 33, 263\n\n# Python list format:\n[1, 33, 263]")
+    assert load_selection(str(path)) == [1, 33, 263]
+
+
+def test_load_selection_skips_leading_blank_and_comment_lines(tmp_path):
+    path = tmp_path / "selection.txt"
+    path.write_text("\n# lips\n61\n291\n\n17\n")
+    assert load_selection(str(path)) == [61, 291]
+
+
+@pytest.mark.parametrize("content", ["", "\n\n", "# nothing selected\n"])
+def test_empty_selection_is_rejected_before_the_batch_runs(tmp_path, monkeypatch, capsys, content):
+    image = str(tmp_path / "face.jpg")
+    touch(image)
+    selection = tmp_path / "selection.txt"
+    selection.write_text(content)
+    monkeypatch.setattr(landmark_batch, "run_batch", lambda *args, **kwargs: pytest.fail("batch started"))
+    assert main([image, "--selection", str(selection)]) == 1
+    assert "No landmark indices" in capsys.readouterr().out
+
+
+def test_main_without_images(tmp_path, capsys):
+    assert main([str(tmp_path)]) == 1
+    assert "No images found" in capsys.readouterr().out
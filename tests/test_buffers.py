@@ -0,0 +1,152 @@
+import time
+
+import numpy as np
+
+from conftest import wait_until
+from landmark_buffers import BufferPool, FramePool, PersistentPhoto, RenderCache
+from landmark_pipeline import FramePipeline, SyntheticFrameSource
+
+
+def test_buffer_pool_reuses_until_shape_or_dtype_changes():
+    pool = BufferPool()
+    a = pool.get("rgb", (48, 64, 3))
+    assert pool.get("rgb", [48, 64, 3]) is a
+    assert pool.allocations == 1
+    assert pool.get("rgb", (48, 64, 3), np.float32) is not a
+    assert pool.get("rgb", (480, 640, 3)).shape == (480, 640, 3)
+    pool.get("gray", (48, 64))
+    assert pool.allocations == 4
+    assert pool.nbytes() == 480 * 640 * 3 + 48 * 64
+    pool.clear()
+    assert pool.nbytes() == 0
+
+
+def test_frame_pool_matches_shape_and_dtype():
+    pool = FramePool()
+    frame = pool.acquire((48, 64, 3))
+    pool.release(frame)
+    assert pool.acquire((48, 64, 3)) is frame
+    pool.release(frame)
+    # A mismatched frame is discarded rather than handed out
+    other = pool.acquire((480, 640, 3))
+    assert other is not frame and other.shape == (480, 640, 3)
+    pool.release(np.empty((48, 64, 3), dtype=np.float32))
+    assert pool.acquire((48, 64, 3)).dtype == np.uint8
+    assert pool.allocations == 3
+
+
+def test_frame_pool_ignores_double_release_and_none():
+    pool = FramePool(max_free=4)
+    frame = pool.acquire((4, 4, 3))
+    pool.release(frame)
+    pool.release(frame)
+    pool.release(None)
+    first, second = pool.acquire((4, 4, 3)), pool.acquire((4, 4, 3))
+    assert first is frame and second is not frame  # handed out once, not twice
+    for _ in range(10):
+        pool.release(np.empty((4, 4, 3), dtype=np.uint8))
+    assert len(pool._free) == 4
+
+
+def test_pipeline_frame_allocations_stay_bounded():
+    num_frames = 200
+    source = SyntheticFrameSource(width=64, height=48, fps=1000, num_frames=num_frames)
+
+    def inference(rgb_frame):
+        time.sleep(0.002)
+        return None
+
+    pipeline = FramePipeline(source, inference)
+    shown = None
+    pipeline.start()
+    try:
+        # Poll and hand frames back like the UI does
+        def drain():
+            nonlocal shown
+            result = pipeline.poll()
+            if result is not None:
+                if shown is not None:
+                    pipeline.release_frame(shown)
+                shown = result.frame_rgb
+            return not pipeline.running
+
+        assert wait_until(drain, timeout=10.0)
+    finally:
+        pipeline.stop()
+    assert pipeline.frames_captured == num_frames
+    assert pipeline.frames_displayed > 1
+    # Capture scratch, both queue slots, the worker's frame and the shown one: never one per frame
+    assert pipeline.frame_pool.allocations <= 6
+
+
+def test_persistent_photo_is_only_recreated_on_resize(monkeypatch):
+    class FakePhotoImage:
+        def __init__(self, mode, size):
+            self.size = size
+            self.pasted = 0
+
+        def paste(self, image):
+            assert image.size == self.size
+            self.pasted += 1
+
+    monkeypatch.setattr("landmark_buffers.ImageTk.PhotoImage", FakePhotoImage)
+    photo = PersistentPhoto()
+    first = photo.update(np.zeros((48, 64, 3), dtype=np.uint8))
+    for _ in range(5):
+        assert photo.update(np.zeros((48, 64, 3), dtype=np.uint8)) is first
+    assert first.pasted == 6
+    resized = photo.update(np.zeros((100, 128, 3), dtype=np.uint8)[::2, ::2])  # non-contiguous input
+    assert resized is not first and resized.size == (64, 50)
+    photo.update(np.zeros((48, 50, 3), dtype=np.uint8))
+    assert photo.recreated == 3
+
+
+def make_build(calls, key, nbytes=10):
+    def build():
+        calls.append(key)
+        return np.zeros(nbytes, dtype=np.uint8)
+    return build
+
+
+def test_render_cache_counts_hits_and_misses():
+    cache = RenderCache()
+    cache.set_canvas_size((800, 600))
+    calls = []
+    first = cache.get("base", make_build(calls, "base"))
+    assert cache.get("base", make_build(calls, "base")) is first
+    cache.get("overlay", make_build(calls, "overlay"))
+    assert calls == ["base", "overlay"]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_render_cache_evicts_least_recently_used():
+    cache = RenderCache(max_entries=2)
+    cache.set_canvas_size((800, 600))
+    calls = []
+    cache.get("a", make_build(calls, "a"))
+    cache.get("b", make_build(calls, "b"))
+    cache.get("a", make_build(calls, "a"))  # "b" is now the least recently used
+    cache.get("c", make_build(calls, "c"))
+    cache.get("a", make_build(calls, "a"))
+    cache.get("b", make_build(calls, "b"))
+    assert calls == ["a", "b", "c", "b"]
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_render_cache_is_emptied_when_the_canvas_size_changes():
+    cache = RenderCache()
+    assert cache.set_canvas_size((800, 600))
+    calls = []
+    cache.get("a", make_build(calls, "a"))
+    cache.get("b", lambda: (np.zeros(5, dtype=np.uint8), np.zeros(7, dtype=np.uint8), "meta"))
+    assert cache.nbytes() == 10 + 5 + 7
+    assert not cache.set_canvas_size((800, 600))
+    cache.get("a", make_build(calls, "a"))
+    assert calls == ["a"]
+    assert cache.set_canvas_size((1024, 768))
+    assert cache.nbytes() == 0
+    cache.get("a", make_build(calls, "a"))
+    assert calls == ["a", "a"]
+    cache.clear()
+    assert cache.nbytes() == 0
+    assert cache.canvas_size == (1024, 768)
@@ -0,0 +1,117 @@
+import cv2
+import numpy as np
+import pytest
+
+from landmark_image import ImageSource, ZoomView, header_size, reduce_factor, to_view
+
+FULL_W, FULL_H = 3000, 2000
+DOT_RADIUS = 20
+# Dot centers in full-resolution pixels; a pixel's center is at index + 0.5
+DOTS = [(x, y) for x in range(150, FULL_W, 300) for y in range(150, FULL_H, 300)]
+
+
+@pytest.fixture(scope="module")
+def dotted_jpeg(tmp_path_factory):
+    image = np.zeros((FULL_H, FULL_W, 3), dtype=np.uint8)
+    for x, y in DOTS:
+        cv2.circle(image, (x, y), DOT_RADIUS, (255, 255, 255), -1)
+    path = str(tmp_path_factory.mktemp("image") / "dots.jpg")
+    assert cv2.imwrite(path, image, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    return path
+
+
+def test_reduce_factor():
+    assert reduce_factor(4000, 3000, 800) == 4
+    assert reduce_factor(3000, 2000, 800) == 2
+    assert reduce_factor(8000, 100, 800) == 8
+    assert reduce_factor(1000, 800, 800) == 1
+    assert reduce_factor(640, 480, 800) == 1
+
+
+def test_layout_fits_and_centers_at_zoom_one():
+    view = ZoomView()
+    scale, rect, display, offset = view.layout(800, 600, 3000, 2000)
+    assert scale == pytest.approx(800 / 3000)
+    assert rect == pytest.approx((0, 0, 1, 1))
+    assert display == (800, 533)
+    assert offset == (0, 33)
+
+
+def test_zoom_at_keeps_the_point_under_the_cursor():
+    view = ZoomView(max_zoom=8.0)
+    size = (800, 600, 3000, 2000)
+    before = view.canvas_to_image(200, 150, *size)
+    view.zoom_at(2.0, 200, 150, *size)
+    assert view.zoom == 2.0
+    assert view.canvas_to_image(200, 150, *size) == pytest.approx(before)
+    view.zoom_at(100.0, 200, 150, *size)
+    assert view.zoom == 8.0
+    view.zoom_at(1e-3, 200, 150, *size)
+    assert view.zoom == 1.0
+    assert view.center == pytest.approx((0.5, 0.5))
+
+
+def test_pan_clamps_the_view_to_the_image():
+    view = ZoomView()
+    size = (800, 600, 3000, 2000)
+    view.zoom_at(4.0, 400, 300, *size)
+    view.pan(1e6, 1e6, *size)
+    _, (x0, y0, x1, y1), _, _ = view.layout(*size)
+    assert (x0, y0) == pytest.approx((0.0, 0.0))
+    view.pan(-1e6, -1e6, *size)
+    _, (x0, y0, x1, y1), _, _ = view.layout(*size)
+    assert (x1, y1) == pytest.approx((1.0, 1.0))
+    assert x1 - x0 == pytest.approx(0.25)
+
+
+def test_to_view():
+    faces = np.array([[[0.5, 0.5, 0.1], [0.25, 0.75, 0.0]]])
+    out = to_view(faces, (0.25, 0.5, 0.75, 1.0))
+    assert out[0, :, :2].tolist() == [[0.5, 0.0], [0.0, 0.5]]
+    assert out[0, :, 2].tolist() == [0.1, 0.0]
+
+
+def test_header_fallback_for_formats_pil_cannot_read(tmp_path):
+    path = str(tmp_path / "image.hdr")
+    if not cv2.imwrite(path, np.full((40, 60, 3), 0.5, dtype=np.float32)):
+        pytest.skip("OpenCV built without Radiance HDR support")
+    assert header_size(path) is None
+    source = ImageSource(path)
+    assert (source.width, source.height) == (60, 40)
+    assert source.decode_factor == 1
+    assert not source.is_large
+
+
+@pytest.mark.parametrize("zoom, center", [(1.0, (0.5, 0.5)), (1.7, (0.3, 0.6)), (3.0, (0.9, 0.1)),
+                                          (8.0, (0.41, 0.52)), (23.0, (0.352, 0.37))])
+def test_render_maps_landmarks_onto_the_dots(dotted_jpeg, zoom, center):
+    source = ImageSource(dotted_jpeg, max_dim=800)
+    try:
+        assert source.decode_factor == 2
+        assert source.full_ready.wait(10) and source.error is None
+        assert (source.width, source.height) == (FULL_W, FULL_H)
+        view = ZoomView()
+        view.zoom, view.center = zoom, center
+        tile, offset, rect = source.render(view, 800, 600)
+        tile_h, tile_w = tile.shape[:2]
+        scale = tile_w / ((rect[2] - rect[0]) * FULL_W)  # tile px per full-res px
+        radius = DOT_RADIUS * scale
+        landmarks = np.array([[[(x + 0.5) / FULL_W, (y + 0.5) / FULL_H, 0.0] for x, y in DOTS]])
+        mapped = to_view(landmarks, rect)[0]
+        checked = 0
+        for u, v, _ in mapped:
+            px, py = u * tile_w, v * tile_h
+            margin = radius + 2
+            if not (margin <= px <= tile_w - margin and margin <= py <= tile_h - margin):
+                continue  # dot clipped by the tile edge
+            x0, y0 = int(px - margin), int(py - margin)
+            x1, y1 = int(np.ceil(px + margin)) + 1, int(np.ceil(py + margin)) + 1
+            window = tile[y0:y1, x0:x1, 0].astype(np.float64)
+            ys, xs = np.mgrid[:window.shape[0], :window.shape[1]]
+            total = window.sum()
+            cx, cy = (xs * window).sum() / total + x0 + 0.5, (ys * window).sum() / total + y0 + 0.5
+            assert abs(cx - px) < 1.0 and abs(cy - py) < 1.0, (zoom, center, (px, py), (cx, cy))
+            checked += 1
+        assert checked >= 1
+    finally:
+        source.close()
@@ -0,0 +1,91 @@
+import time
+
+import numpy as np
+
+from conftest import wait_until
+from landmark_pipeline import FramePipeline, LatestFrameQueue, SyntheticFrameSource
+from landmark_smoothing import KeyframeScheduler
+
+
+def test_latest_frame_queue_counts_overwritten_items():
+    dropped = []
+    q = LatestFrameQueue(on_drop=dropped.append)
+    for i in range(5):
+        q.put(i)
+    assert q.get_nowait() == 4
+    assert q.get_nowait() is None
+    assert q.dropped == 4
+    assert dropped == [0, 1, 2, 3]
+
+    q.put(5)
+    q.clear()
+    assert q.get(timeout=0.01) is None
+    assert dropped[-1] == 5
+    assert q.dropped == 4  # clearing is not a drop
+
+
+def test_synthetic_source_stops_after_num_frames():
+    source = SyntheticFrameSource(width=64, height=48, fps=0, num_frames=3)
+    frames = [source.read() for _ in range(4)]
+    assert [ret for ret, _ in frames] == [True, True, True, False]
+    assert frames[0][1].shape == (48, 64, 3)
+    assert frames[0][1].dtype == np.uint8
+
+
+def test_pipeline_drops_frames_behind_slow_inference():
+    num_frames = 40
+    source = SyntheticFrameSource(width=64, height=48, fps=200, num_frames=num_frames)
+
+    def slow_inference(rgb_frame):
+        time.sleep(0.02)
+        return np.zeros((478, 3), dtype=np.float32)
+
+    pipeline = FramePipeline(source, slow_inference)
+    pipeline.start()
+    try:
+        assert wait_until(lambda: not pipeline.running)
+    finally:
+        pipeline.stop()
+
+    assert pipeline.error == "Could not read frame from source"
+    assert pipeline.frames_captured == num_frames
+    assert 0 < pipeline.frames_processed < num_frames
+    assert pipeline.capture_queue.dropped > 0
+    # Every captured frame was either processed, overwritten, or still pending when the source ran out
+    pending = num_frames - pipeline.frames_processed - pipeline.capture_queue.dropped
+    assert pending in (0, 1)
+    assert pipeline.dropped_frames == pipeline.capture_queue.dropped + pipeline.result_queue.dropped
+
+
+def test_pipeline_poll_returns_newest_result():
+    source = SyntheticFrameSource(width=64, height=48, fps=100, num_frames=5)
+    pipeline = FramePipeline(source, lambda rgb_frame: None, flip=False)
+    pipeline.start()
+    try:
+        assert wait_until(lambda: not pipeline.running)
+        # Workers have exited; the last finished result is still waiting for the UI
+        result = pipeline.poll()
+        assert result is not None
+        assert result.landmarks is None
+        assert result.frame_rgb.shape == (48, 64, 3)
+        assert 0 <= result.frame_index < 5
+        assert pipeline.poll() is None
+        assert pipeline.frames_displayed == 1
+        assert pipeline.frames_processed == pipeline.frames_displayed + pipeline.result_queue.dropped
+    finally:
+        pipeline.stop()
+
+
+def test_pipeline_runs_inference_on_keyframes_only():
+    source = SyntheticFrameSource(width=64, height=48, fps=100, num_frames=12)
+    inferred = []
+    pipeline = FramePipeline(source, lambda rgb_frame: inferred.append(rgb_frame.shape),
+                             keyframe_scheduler=KeyframeScheduler(interval=3))
+    pipeline.start()
+    try:
+        assert wait_until(lambda: not pipeline.running)
+    finally:
+        pipeline.stop()
+    assert pipeline.frames_processed == len(inferred)
+    assert pipeline.frames_skipped > 0
+    assert pipeline.frames_processed <= pipeline.frames_skipped
@@ -0,0 +1,85 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from landmark_profiler import RingBuffer, StageProfiler
+
+
+def test_ring_buffer_returns_oldest_first_after_wraparound():
+    buffer = RingBuffer(4)
+    timestamps, values = buffer.ordered()
+    assert len(buffer) == 0 and len(timestamps) == 0
+    for i in range(3):
+        buffer.append(float(i), i * 10.0)
+    assert buffer.ordered()[1].tolist() == [0.0, 10.0, 20.0]
+    for i in range(3, 10):
+        buffer.append(float(i), i * 10.0)
+    timestamps, values = buffer.ordered()
+    assert len(buffer) == 4
+    assert timestamps.tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert values.tolist() == [60.0, 70.0, 80.0, 90.0]
+    # Exactly full, at a wraparound boundary
+    buffer.append(10.0, 100.0)
+    buffer.append(11.0, 110.0)
+    assert buffer.ordered()[0].tolist() == [8.0, 9.0, 10.0, 11.0]
+
+
+def make_profiler():
+    profiler = StageProfiler(capacity=50)
+    for i in range(100):  # overflows capacity; only samples 50..99 remain
+        profiler.record("inference", (i + 1) / 1000.0, timestamp=float(i))
+        profiler.record("capture", 0.002, timestamp=float(i))
+        profiler.record("custom", 0.001, timestamp=float(i))
+    return profiler
+
+
+def test_summary_percentiles_and_stage_order():
+    profiler = make_profiler()
+    stats = profiler.summary()["stages"]
+    assert list(stats) == ["capture", "inference", "custom"]
+    inference_ms = np.arange(51, 101, dtype=np.float64)
+    assert stats["inference"]["count"] == 50
+    assert stats["inference"]["p50"] == pytest.approx(np.percentile(inference_ms, 50))
+    assert stats["inference"]["p95"] == pytest.approx(np.percentile(inference_ms, 95))
+    assert stats["inference"]["mean"] == pytest.approx(inference_ms.mean())
+    assert stats["capture"]["p50"] == pytest.approx(2.0)
+    assert "inference" in profiler.format_summary()
+
+
+def test_fps_from_frame_timestamps(monkeypatch):
+    profiler = StageProfiler()
+    assert profiler.fps() == 0.0
+    clock = iter(np.arange(0.0, 1.0001, 0.04))  # 26 frames, 40 ms apart
+    monkeypatch.setattr("landmark_profiler.time.perf_counter", lambda: next(clock))
+    for _ in range(26):
+        profiler.frame_done()
+    assert profiler.fps() == pytest.approx(25.0)
+    assert profiler.summary()["fps"] == pytest.approx(25.0)
+    profiler.reset()
+    assert profiler.fps() == 0.0 and profiler.summary()["stages"] == {}
+
+
+def test_dump_json_round_trip(tmp_path):
+    profiler = make_profiler()
+    path = tmp_path / "trace.json"
+    profiler.dump(str(path))
+    trace = json.loads(path.read_text())
+    assert trace["summary"]["stages"]["inference"]["count"] == 50
+    samples = trace["samples"]["inference"]
+    assert samples["timestamp"] == [float(i) for i in range(50, 100)]
+    assert samples["ms"] == pytest.approx([float(i + 1) for i in range(50, 100)])
+
+
+def test_dump_csv_round_trip(tmp_path):
+    profiler = make_profiler()
+    path = tmp_path / "trace.CSV"
+    profiler.dump(str(path))
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["stage", "timestamp", "ms"]
+    inference = [row for row in rows[1:] if row[0] == "inference"]
+    assert len(rows) == 1 + 3 * 50
+    assert [float(t) for _, t, _ in inference] == [float(i) for i in range(50, 100)]
+    assert [float(ms) for _, _, ms in inference] == pytest.approx([float(i + 1) for i in range(50, 100)])
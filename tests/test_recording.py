@@ -0,0 +1,87 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from conftest import make_landmarks
+from landmark_recording import LandmarkRecorder, LandmarkRecording, main, read_recording
+
+
+def test_round_trip_across_chunks(tmp_path):
+    path = str(tmp_path / "session.lmrec")
+    indices = [263, 1, 33]
+    recorder = LandmarkRecorder(path, indices, max_faces=2, chunk_frames=4)
+    frames = []
+    for i in range(10):
+        if i % 5 == 4:
+            landmarks = None
+        elif i % 2:
+            landmarks = make_landmarks(2, seed=i)
+        else:
+            landmarks = make_landmarks(1, seed=i)[0]  # single face as (N, 3)
+        frames.append(landmarks)
+        recorder.append(landmarks, 100.0 + i / 30)
+    recorder.close()
+    assert recorder.error is None
+    assert recorder.frames_written == 10
+    assert sorted(os.listdir(path)) == ["coords_00000.npy", "coords_00001.npy", "coords_00002.npy", "meta.json",
+                                        "times_00000.npy", "times_00001.npy", "times_00002.npy"]
+
+    read_indices, timestamps, coords = read_recording(path)
+    assert read_indices.tolist() == [1, 33, 263]
+    assert np.allclose(timestamps, np.arange(10) / 30)
+    assert coords.shape == (10, 2, 3, 3)
+    for i, landmarks in enumerate(frames):
+        if landmarks is None:
+            assert np.isnan(coords[i]).all()
+        elif landmarks.ndim == 2:
+            assert np.array_equal(coords[i, 0], landmarks[[1, 33, 263]])
+            assert np.isnan(coords[i, 1]).all()
+        else:
+            assert np.array_equal(coords[i], landmarks[:, [1, 33, 263]])
+
+
+def test_extra_faces_are_cut_to_max_faces(tmp_path):
+    path = str(tmp_path / "one.lmrec")
+    recorder = LandmarkRecorder(path, [10], max_faces=1)
+    landmarks = make_landmarks(3, seed=0)
+    recorder.append(landmarks, 5.0)
+    recorder.close()
+    _, timestamps, coords = read_recording(path)
+    assert timestamps.tolist() == [0.0]
+    assert np.array_equal(coords, landmarks[None, :1, [10]])
+
+
+def test_empty_recording_and_validation(tmp_path):
+    path = str(tmp_path / "empty.lmrec")
+    with pytest.raises(ValueError):
+        LandmarkRecorder(path, [])
+    LandmarkRecorder(path, [1, 2], max_faces=2).close()
+    recording = LandmarkRecording(path)
+    assert len(recording) == 0
+    timestamps, coords = recording.load()
+    assert timestamps.shape == (0,)
+    assert coords.shape == (0, 2, 2, 3)
+
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    meta["version"] = 99
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    with pytest.raises(ValueError, match="Unsupported recording version"):
+        LandmarkRecording(path)
+
+
+def test_cli_summary_and_export(tmp_path, capsys):
+    path = str(tmp_path / "cli.lmrec")
+    recorder = LandmarkRecorder(path, [1, 2])
+    recorder.append(make_landmarks(1, seed=0), 0.0)
+    recorder.append(None, 0.5)
+    recorder.close()
+    export = str(tmp_path / "cli.npz")
+    assert main([path, "--export", export]) == 0
+    assert "2 frames over 0.50s, 2 landmarks, 1 face slot(s), face found in 1 frames" in capsys.readouterr().out
+    with np.load(export) as data:
+        assert data["coords"].shape == (2, 1, 2, 3)
+        assert data["indices"].tolist() == [1, 2]
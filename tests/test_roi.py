@@ -0,0 +1,106 @@
+import numpy as np
+
+from conftest import StubFaceMesh
+from landmark_roi import RoiTracker, landmarks_bbox
+
+WIDTH, HEIGHT = 640, 480
+# Face spanning x 256..384 px and y 144..336 px of a 640x480 frame
+FULL_LANDMARKS = np.array([[0.4, 0.3, 0.0], [0.6, 0.7, -0.05], [0.5, 0.5, 0.02]], dtype=np.float32)
+CROP_LANDMARKS = np.array([[0.0, 0.0, 0.1], [1.0, 1.0, -0.2], [0.25, 0.75, 0.0]], dtype=np.float32)
+
+
+def make_frame():
+    return np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+
+def test_bbox_is_square_padded_and_clipped():
+    # 128x192 px face, padded by 25% on each side of the longer edge -> 288 px square around (320, 240)
+    assert landmarks_bbox(FULL_LANDMARKS, WIDTH, HEIGHT, 0.25) == (176, 96, 464, 384)
+    near_edge = np.array([[0.0, 0.0, 0.0], [0.1, 0.2, 0.0]], dtype=np.float32)
+    x0, y0, x1, y1 = landmarks_bbox(near_edge, WIDTH, HEIGHT, 0.5)
+    assert (x0, y0) == (0, 0)
+    assert x1 <= WIDTH and y1 <= HEIGHT
+
+
+def test_bbox_rejects_degenerate_boxes():
+    assert landmarks_bbox(np.full((3, 3), 0.5, dtype=np.float32), WIDTH, HEIGHT, 0.25) is None
+    outside = np.array([[1.5, 1.5, 0.0], [1.6, 1.7, 0.0]], dtype=np.float32)
+    assert landmarks_bbox(outside, WIDTH, HEIGHT, 0.25) is None
+
+
+def test_roi_landmarks_map_back_to_full_frame():
+    full_mesh = StubFaceMesh(lambda image: FULL_LANDMARKS)
+    roi_mesh = StubFaceMesh(lambda image: CROP_LANDMARKS)
+    tracker = RoiTracker(full_mesh, roi_mesh, target_size=144, padding=0.25)
+
+    first = tracker.process(make_frame())
+    assert np.array_equal(first, FULL_LANDMARKS)
+    assert tracker.roi == (176, 96, 464, 384)
+
+    landmarks = tracker.process(make_frame())
+    # The 288 px crop is downscaled to target_size before inference
+    assert roi_mesh.shapes == [(144, 144, 3)]
+    x0, y0, x1, y1 = 176, 96, 464, 384
+    crop_w, crop_h = x1 - x0, y1 - y0
+    expected = np.stack([(CROP_LANDMARKS[:, 0] * crop_w + x0) / WIDTH,
+                         (CROP_LANDMARKS[:, 1] * crop_h + y0) / HEIGHT,
+                         CROP_LANDMARKS[:, 2] * crop_w / WIDTH], axis=1)
+    assert np.allclose(landmarks, expected)
+    assert np.allclose(landmarks[0, :2], (x0 / WIDTH, y0 / HEIGHT))
+    assert np.allclose(landmarks[1, :2], (x1 / WIDTH, y1 / HEIGHT))
+    assert (tracker.full_frames, tracker.roi_frames) == (1, 1)
+    # The ROI follows the mapped landmarks
+    assert tracker.roi == landmarks_bbox(expected, WIDTH, HEIGHT, 0.25)
+
+
+def test_small_roi_is_not_upscaled():
+    tracker = RoiTracker(StubFaceMesh(lambda image: FULL_LANDMARKS), StubFaceMesh(lambda image: CROP_LANDMARKS),
+                         target_size=1024)
+    tracker.process(make_frame())
+    tracker.process(make_frame())
+    assert tracker.roi_face_mesh.shapes == [(288, 288, 3)]
+
+
+def test_lost_face_falls_back_to_full_frame():
+    full_results = [FULL_LANDMARKS, FULL_LANDMARKS, None]
+    full_mesh = StubFaceMesh(lambda image: full_results.pop(0))
+    roi_mesh = StubFaceMesh(lambda image: None)
+    tracker = RoiTracker(full_mesh, roi_mesh)
+
+    tracker.process(make_frame())
+    # ROI inference finds nothing: the same frame is re-run on the full frame
+    assert np.array_equal(tracker.process(make_frame()), FULL_LANDMARKS)
+    assert tracker.lost_count == 1
+    assert (tracker.full_frames, tracker.roi_frames) == (2, 1)
+    assert tracker.roi is not None
+
+    assert tracker.process(make_frame()) is None
+    assert tracker.lost_count == 2
+    assert tracker.roi is None
+
+
+def test_reset_drops_the_roi_on_the_next_frame():
+    tracker = RoiTracker(StubFaceMesh(lambda image: FULL_LANDMARKS), StubFaceMesh(lambda image: CROP_LANDMARKS))
+    tracker.process(make_frame())
+    tracker.reset()
+    assert tracker.roi is not None  # only the processing thread touches the ROI
+    tracker.process(make_frame())
+    assert not tracker.reset_requested
+    assert (tracker.full_frames, tracker.roi_frames) == (2, 0)
+
+
+def test_reset_during_process_is_not_overwritten():
+    def reset_mid_frame(image):
+        tracker.reset()
+        return CROP_LANDMARKS
+
+    tracker = RoiTracker(StubFaceMesh(lambda image: FULL_LANDMARKS), StubFaceMesh(reset_mid_frame))
+    tracker.process(make_frame())
+    roi = tracker.roi
+    assert tracker.process(make_frame()) is not None
+    # The frame's result is still returned, but its ROI is not stored over the pending reset
+    assert tracker.roi == roi
+    assert tracker.reset_requested
+    tracker.process(make_frame())
+    assert (tracker.full_frames, tracker.roi_frames) == (2, 1)
+    assert not tracker.reset_requested
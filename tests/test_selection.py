@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from landmark_selection import LandmarkGrid, points_in_polygon, points_in_rect
+
+
+def brute_force_nearest(points, x, y, max_distance):
+    dist_sq = ((points - (x, y)) ** 2).sum(axis=1)
+    best = int(np.argmin(dist_sq))
+    return best if dist_sq[best] < max_distance ** 2 else None
+
+
+@pytest.mark.parametrize("max_distance", [4.0, 10.0, 40.0])
+def test_grid_nearest_matches_brute_force(max_distance):
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 640, size=(478, 2)).astype(np.float32)
+    grid = LandmarkGrid(points, cell_size=16)
+    for x, y in rng.uniform(-20, 660, size=(300, 2)):
+        expected = brute_force_nearest(points, x, y, max_distance)
+        found = grid.nearest(x, y, max_distance)
+        if expected is None:
+            assert found is None
+        else:
+            # Ties between equidistant points may resolve either way
+            assert found is not None
+            assert np.isclose(np.hypot(*(points[found] - (x, y))), np.hypot(*(points[expected] - (x, y))))
+
+
+def test_grid_handles_empty_and_negative_points():
+    assert LandmarkGrid(np.empty((0, 2))).nearest(5, 5, 8) is None
+    grid = LandmarkGrid([[-3.0, -3.0], [100.0, 100.0]], cell_size=16)
+    assert grid.nearest(-1, -1, 8) == 0
+    assert grid.nearest(50, 50, 8) is None
+
+
+def test_points_in_rect_accepts_corners_in_any_order():
+    points = np.array([[0, 0], [5, 5], [10, 10], [11, 5]], dtype=np.float32)
+    expected = [True, True, True, False]
+    assert points_in_rect(points, 0, 0, 10, 10).tolist() == expected
+    assert points_in_rect(points, 10, 10, 0, 0).tolist() == expected
+
+
+def test_points_in_polygon_concave():
+    # U shape: the notch between the arms is outside
+    polygon = [(0, 0), (30, 0), (30, 30), (20, 30), (20, 10), (10, 10), (10, 30), (0, 30)]
+    points = np.array([[5, 20], [25, 20], [15, 5], [15, 20], [35, 5], [-1, 5]], dtype=np.float32)
+    assert points_in_polygon(points, polygon).tolist() == [True, True, True, False, False, False]
+
+
+def test_points_in_polygon_matches_opencv():
+    cv2 = pytest.importorskip("cv2")
+    rng = np.random.default_rng(1)
+    angles = np.sort(rng.uniform(0, 2 * np.pi, 12))
+    radii = rng.uniform(40, 100, 12)
+    polygon = np.stack([200 + radii * np.cos(angles), 200 + radii * np.sin(angles)], axis=1)
+    points = rng.uniform(80, 320, size=(500, 2)).astype(np.float32)
+    contour = polygon.astype(np.float32).reshape(-1, 1, 2)
+    distances = np.array([cv2.pointPolygonTest(contour, (float(x), float(y)), True) for x, y in points])
+    clear = np.abs(distances) > 1e-3  # skip points on the boundary
+    assert np.array_equal(points_in_polygon(points, polygon)[clear], distances[clear] > 0)
+
+
+def test_points_in_polygon_needs_three_vertices():
+    points = np.array([[1, 1]], dtype=np.float32)
+    assert not points_in_polygon(points, [(0, 0), (2, 2)]).any()
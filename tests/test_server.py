@@ -0,0 +1,101 @@
+import asyncio
+import os
+import socket
+
+import numpy as np
+import pytest
+
+from conftest import make_landmarks, wait_until
+from landmark_server import (HEADER, LandmarkClient, LandmarkServer, decode_header, encode_frame,
+                             parse_address, read_frame)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "landmarks.sock")
+
+
+def test_parse_address():
+    assert parse_address("unix:/tmp/a.sock") == ("unix", "/tmp/a.sock")
+    assert parse_address("./a.sock") == ("unix", "./a.sock")
+    assert parse_address(":9000") == ("tcp", ("127.0.0.1", 9000))
+    assert parse_address("0.0.0.0:9000") == ("tcp", ("0.0.0.0", 9000))
+
+
+def test_encode_frame_layout():
+    landmarks = make_landmarks(faces=2)
+    indices = [1, 33, 263]
+    data = encode_frame(landmarks, 7, 12.5, indices)
+    assert decode_header(data[:HEADER.size]) == (7, 12.5, 2, 3, 1)
+    assert len(data) == HEADER.size + 2 * 3 + 12 * 2 * 3
+    assert len(encode_frame(landmarks[0], 0, 0.0)) == HEADER.size + 12 * 478
+    assert decode_header(encode_frame(None, 0, 0.0, indices)[:HEADER.size])[2:4] == (0, 3)
+    with pytest.raises(ValueError):
+        decode_header(b"XXXX" + data[4:HEADER.size])
+
+
+def test_read_frame_decodes_async_stream():
+    landmarks = make_landmarks()
+    data = encode_frame(landmarks, 3, 1.5, [10, 20])
+
+    async def decode():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await read_frame(reader)
+
+    frame = asyncio.run(decode())
+    assert frame.frame_index == 3
+    assert frame.indices.tolist() == [10, 20]
+    assert np.array_equal(frame.coords, landmarks[:, [10, 20]])
+
+
+@pytest.mark.parametrize("unix", [True, False])
+def test_publish_round_trip(unix, socket_path):
+    # Deep enough that none of the three back-to-back frames is dropped
+    server = LandmarkServer(socket_path if unix else "127.0.0.1:0", max_queue=4)
+    try:
+        with LandmarkClient(server.bound_address, timeout=5.0) as client:
+            assert wait_until(lambda: server.num_clients == 1)
+            landmarks = make_landmarks()
+            indices = [1, 4, 152]
+            server.publish(landmarks[0], timestamp=1.0)
+            server.publish(landmarks, timestamp=2.0, indices=indices)
+            server.publish(None, timestamp=3.0, indices=indices)
+
+            full, subset, empty = client.recv(), client.recv(), client.recv()
+            assert [f.frame_index for f in (full, subset, empty)] == [0, 1, 2]
+            assert [f.timestamp for f in (full, subset, empty)] == [1.0, 2.0, 3.0]
+            assert np.array_equal(full.indices, np.arange(478))
+            assert np.array_equal(full.coords, landmarks)
+            assert subset.indices.tolist() == indices
+            assert np.array_equal(subset.coords, landmarks[:, indices])
+            assert empty.coords.shape == (0, 3, 3)
+    finally:
+        server.close()
+    if unix:
+        assert not os.path.exists(socket_path)
+
+
+def test_refuses_to_replace_regular_file(socket_path):
+    with open(socket_path, "w") as f:
+        f.write("keep me")
+    with pytest.raises(OSError, match="not a socket"):
+        LandmarkServer(socket_path)
+    with open(socket_path) as f:
+        assert f.read() == "keep me"
+
+
+def test_refuses_live_socket_and_replaces_stale_one(socket_path):
+    server = LandmarkServer(socket_path)
+    try:
+        with pytest.raises(OSError, match="already listening"):
+            LandmarkServer(socket_path)
+    finally:
+        server.close()
+
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)  # bound but never listening, like a socket left behind by a crash
+    stale.close()
+    server = LandmarkServer(socket_path)
+    server.close()
@@ -0,0 +1,63 @@
+import numpy as np
+
+from landmark_smoothing import KeyframeScheduler, OneEuroFilter, RateCounter
+
+
+def test_one_euro_first_update_passes_through_and_constant_input_stays_put():
+    landmarks = np.random.default_rng(0).uniform(0, 1, size=(478, 3)).astype(np.float32)
+    smoother = OneEuroFilter()
+    assert smoother.predict(0.0) is None
+    first = smoother.update(landmarks, 0.0)
+    assert np.array_equal(first, landmarks)
+    first[:] = 0  # returned arrays are copies
+    for i in range(1, 10):
+        assert np.allclose(smoother.update(landmarks, i / 30), landmarks)
+    assert np.allclose(smoother.predict(1.0), landmarks)
+
+
+def test_one_euro_smooths_steps_and_predicts_motion():
+    smoother = OneEuroFilter(min_cutoff=1.0, beta=0.0)
+    smoother.update(np.zeros((1, 3)), 0.0)
+    step = smoother.update(np.ones((1, 3)), 1 / 30)
+    assert np.all((step > 0) & (step < 1))
+
+    smoother = OneEuroFilter(min_cutoff=1.0, beta=1.0, max_prediction=0.1)
+    for i in range(60):
+        t = i / 30
+        value = smoother.update(np.full((1, 3), t, dtype=np.float32), t)
+    assert np.all(smoother.predict(t + 0.05) > value)
+    # Extrapolation is capped at max_prediction past the last keyframe
+    assert np.allclose(smoother.predict(t + 10.0), smoother.predict(t + 0.1))
+
+
+def test_one_euro_restarts_on_shape_change_or_time_going_back():
+    smoother = OneEuroFilter()
+    smoother.update(np.zeros((2, 3)), 1.0)
+    assert np.array_equal(smoother.update(np.ones((3, 3)), 2.0), np.ones((3, 3)))
+    assert np.array_equal(smoother.update(np.full((3, 3), 5.0), 0.5), np.full((3, 3), 5.0))
+    smoother.reset()
+    assert smoother.predict(3.0) is None
+
+
+def test_keyframe_scheduler_interval():
+    scheduler = KeyframeScheduler(interval=3)
+    assert [scheduler.is_keyframe(i / 30) for i in range(7)] == [True, False, False, True, False, False, True]
+    scheduler.reset()
+    assert scheduler.is_keyframe(1.0)
+
+
+def test_keyframe_scheduler_max_rate():
+    scheduler = KeyframeScheduler(interval=1, max_rate=10.0)
+    keyframes = [scheduler.is_keyframe(i / 60) for i in range(60)]
+    assert keyframes[0]
+    assert sum(keyframes) == 10
+
+
+def test_rate_counter():
+    counter = RateCounter(window=10)
+    assert counter.rate() == 0.0
+    for i in range(20):
+        counter.tick(i * 0.05)
+    assert np.isclose(counter.rate(), 20.0)
+    counter.reset()
+    assert counter.rate() == 0.0
@@ -0,0 +1,139 @@
+import json
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from conftest import StubFaceMesh, wait_until
+from landmark_track import LandmarkTrack, TrackBuilder, VideoFrameReader
+
+NUM_FRAMES = 10
+NO_FACE_FRAME = 6
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    """Small MJPG clip whose frame i is a flat gray of brightness 20 * i."""
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    if not writer.isOpened():
+        pytest.skip("OpenCV built without an MJPG writer")
+    for i in range(NUM_FRAMES):
+        writer.write(np.full((48, 64, 3), 20 * i, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def frame_number(image):
+    return int(round(image.mean() / 20))
+
+
+def brightness_mesh(seen, delay=0.0):
+    """Stub FaceMesh whose single landmark row encodes the frame number; no face on NO_FACE_FRAME."""
+    def respond(image):
+        time.sleep(delay)
+        index = frame_number(image)
+        seen.append(index)
+        if index == NO_FACE_FRAME:
+            return None
+        return np.full((478, 3), index / 100, dtype=np.float32)
+    return StubFaceMesh(respond)
+
+
+def build(track, mesh):
+    builder = TrackBuilder(track, lambda: mesh)
+    builder.start()
+    assert wait_until(lambda: not builder.running)
+    return builder
+
+
+def test_builds_the_whole_track(video_path):
+    track = LandmarkTrack(video_path, NUM_FRAMES)
+    seen = []
+    mesh = brightness_mesh(seen)
+    builder = build(track, mesh)
+    assert builder.error is None
+    assert mesh.closed
+    assert track.complete and track.frames_done == NUM_FRAMES
+    assert seen == list(range(NUM_FRAMES))
+    for i in range(NUM_FRAMES):
+        landmarks = track.frame_landmarks(i)
+        if i == NO_FACE_FRAME:
+            assert landmarks is None
+        else:
+            assert landmarks.shape == (478, 3)
+            assert np.allclose(landmarks, i / 100)
+
+    reopened = LandmarkTrack(video_path, NUM_FRAMES)
+    assert reopened.complete
+    assert np.allclose(reopened.frame_landmarks(3), 0.03)
+
+
+def test_stopped_build_resumes_from_the_sidecar(video_path):
+    track = LandmarkTrack(video_path, NUM_FRAMES)
+    seen = []
+    builder = TrackBuilder(track, lambda: brightness_mesh(seen, delay=0.05))
+    builder.start()
+    assert wait_until(lambda: track.frames_done >= 3)
+    builder.stop()
+    done = track.frames_done
+    assert 3 <= done < NUM_FRAMES and not track.complete
+    with open(track.progress_path) as f:
+        progress = json.load(f)
+    assert progress["frames_done"] == done and not progress["complete"]
+    assert track.frame_landmarks(done) is None
+
+    resumed = LandmarkTrack(video_path, NUM_FRAMES)
+    assert resumed.frames_done == done and not resumed.complete
+    assert np.allclose(resumed.frame_landmarks(2), 0.02)
+    seen_after = []
+    builder = build(resumed, brightness_mesh(seen_after))
+    assert builder.error is None
+    # Only the remaining frames are run, starting at the first unprocessed one
+    assert seen_after == list(range(done, NUM_FRAMES))
+    assert resumed.complete
+    assert np.allclose(resumed.frame_landmarks(NUM_FRAMES - 1), (NUM_FRAMES - 1) / 100)
+
+
+def test_changed_video_invalidates_the_track(video_path):
+    track = LandmarkTrack(video_path, NUM_FRAMES)
+    build(track, brightness_mesh([]))
+    with open(video_path, "ab") as f:
+        f.write(b"\0" * 16)
+    fresh = LandmarkTrack(video_path, NUM_FRAMES)
+    assert fresh.frames_done == 0 and not fresh.complete
+    assert fresh.frame_landmarks(0) is None
+
+
+def test_factory_error_is_reported(video_path):
+    def failing_factory():
+        raise RuntimeError("model failed to load")
+
+    track = LandmarkTrack(video_path, NUM_FRAMES)
+    builder = TrackBuilder(track, failing_factory)
+    builder.start()
+    assert wait_until(lambda: not builder.running)
+    assert builder.error == "model failed to load"
+    assert not track.complete and track.frames_done == 0
+
+
+def test_unreadable_video_is_reported(tmp_path):
+    path = str(tmp_path / "broken.avi")
+    with open(path, "wb") as f:
+        f.write(b"not a video")
+    mesh = StubFaceMesh(lambda image: None)
+    builder = build(LandmarkTrack(path, NUM_FRAMES), mesh)
+    assert builder.error == "Could not open video file"
+    assert not builder.track.complete
+    assert mesh.shapes == []
+
+
+def test_frame_reader_random_access(video_path):
+    reader = VideoFrameReader(video_path)
+    try:
+        assert reader.frame_count == NUM_FRAMES
+        assert [frame_number(reader.read_rgb(i)) for i in (0, 1, 7, 3, 4)] == [0, 1, 7, 3, 4]
+        assert reader.read_rgb(NUM_FRAMES) is None
+    finally:
+        reader.release()